@@ -3,6 +3,7 @@ const router = express.Router();
 const multer = require('multer');
 const path = require('path');
 const fs = require('fs');
+const readline = require('readline');
 const { spawn } = require('child_process');
 
 // Store file paths
@@ -66,6 +67,93 @@ function runPython(scriptName, args = []) {
   });
 }
 
+// Long-lived `smart_processor.py serve` workers, one per file, so repeated
+// prepare-viz calls skip Python startup and the load + clean pass.
+// Keys are kept in least-recently-used order; each worker holds a whole
+// cleaned frame in memory, so only VIZ_WORKER_LIMIT stay alive at once
+const vizWorkers = {};
+const VIZ_WORKER_IDLE_MS = 5 * 60 * 1000;
+const VIZ_WORKER_LIMIT = 4;
+
+function startVizWorker(filepath, mtimeMs) {
+  const pythonPath = path.join(__dirname, '../../python-engine', 'smart_processor.py');
+  const workingDir = path.join(__dirname, '../../python-engine');
+  const pythonCommand = process.platform === 'win32' ? 'py' : 'python';
+
+  // Make room by stopping the least recently used workers
+  const running = Object.keys(vizWorkers);
+  while (running.length >= VIZ_WORKER_LIMIT) {
+    const oldest = running.shift();
+    console.log('🛑 Stopping viz worker for:', path.basename(oldest));
+    vizWorkers[oldest].python.kill();
+    delete vizWorkers[oldest];
+  }
+
+  console.log('🐍 Starting viz worker for:', path.basename(filepath));
+
+  const python = spawn(pythonCommand, [pythonPath, 'serve', filepath], { cwd: workingDir });
+  const worker = { python, mtimeMs, pending: [], idleTimer: null };
+
+  // Replies come back one JSON line per request, in order; the first is the ready line
+  let ready;
+  worker.ready = new Promise((resolve, reject) => { ready = { resolve, reject }; });
+  worker.pending.push(ready);
+
+  readline.createInterface({ input: python.stdout }).on('line', (line) => {
+    const waiter = worker.pending.shift();
+    if (!waiter) return;
+    try {
+      waiter.resolve(JSON.parse(line));
+    } catch (e) {
+      waiter.reject(new Error('Invalid JSON response from Python'));
+    }
+  });
+
+  python.stderr.on('data', (data) => {
+    console.error('❌ Python error:', data.toString());
+  });
+
+  const fail = (reason) => {
+    if (vizWorkers[filepath] === worker) delete vizWorkers[filepath];
+    clearTimeout(worker.idleTimer);
+    worker.pending.splice(0).forEach((waiter) => waiter.reject(new Error(reason)));
+  };
+  python.on('error', (error) => fail(error.message));
+  python.stdin.on('error', (error) => fail(error.message));
+  python.on('close', (code) => fail(`Viz worker exited with code ${code}`));
+
+  vizWorkers[filepath] = worker;
+  return worker;
+}
+
+async function prepareVizInWorker(filepath, vizConfig) {
+  const { mtimeMs } = fs.statSync(filepath);
+  let worker = vizWorkers[filepath];
+
+  // A re-uploaded file gets a fresh worker
+  if (worker && worker.mtimeMs !== mtimeMs) {
+    worker.python.kill();
+    delete vizWorkers[filepath];
+    worker = null;
+  }
+  if (!worker) worker = startVizWorker(filepath, mtimeMs);
+
+  // Move to the most recently used end
+  delete vizWorkers[filepath];
+  vizWorkers[filepath] = worker;
+
+  const started = await worker.ready;
+  if (!started.success) throw new Error(started.error || 'Viz worker failed to start');
+
+  clearTimeout(worker.idleTimer);
+  worker.idleTimer = setTimeout(() => worker.python.kill(), VIZ_WORKER_IDLE_MS);
+
+  return new Promise((resolve, reject) => {
+    worker.pending.push({ resolve, reject });
+    worker.python.stdin.write(JSON.stringify(vizConfig) + '\n');
+  });
+}
+
 // Analyze endpoint
 router.post('/analyze', upload.single('file'), async (req, res) => {
   try {
@@ -110,18 +198,25 @@ router.post('/prepare-viz', async (req, res) => {
       return res.status(404).json({ success: false, error: 'File not found' });
     }
     
-    // Write viz_config to temp file
-    const tempConfigFile = path.join(__dirname, '../../uploads', `viz_config_${Date.now()}.json`);
-    fs.writeFileSync(tempConfigFile, JSON.stringify(viz_config), 'utf8');
-    
-    const result = await runPython('smart_processor.py', [
-      'prepare_viz',
-      filepath,
-      tempConfigFile
-    ]);
-    
-    // Clean up
-    try { fs.unlinkSync(tempConfigFile); } catch (e) {}
+    let result;
+    try {
+      result = await prepareVizInWorker(filepath, viz_config);
+    } catch (workerError) {
+      console.error('⚠️ Viz worker unavailable, running once:', workerError.message);
+      
+      // Write viz_config to temp file
+      const tempConfigFile = path.join(__dirname, '../../uploads', `viz_config_${Date.now()}.json`);
+      fs.writeFileSync(tempConfigFile, JSON.stringify(viz_config), 'utf8');
+      
+      result = await runPython('smart_processor.py', [
+        'prepare_viz',
+        filepath,
+        tempConfigFile
+      ]);
+      
+      // Clean up
+      try { fs.unlinkSync(tempConfigFile); } catch (e) {}
+    }
     
     console.log('✅ Visualization prepared!');
     res.json(result);
@@ -7,6 +7,20 @@ import numpy as np
 import json
 import sys
 from datetime import timedelta
+from improved_autonomous_ai import EnhancedAutonomousAI, emit_json
+
+# Max points returned for a bubble chart
+BUBBLE_POINTS = 100
+
+def stratified_sample(codes, n_per_group, seed=0):
+    """Sorted row indices with up to n_per_group random rows per group code"""
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(codes))
+    order = order[np.argsort(codes[order], kind='stable')]
+    grouped = codes[order]
+    starts = np.flatnonzero(np.concatenate(([True], grouped[1:] != grouped[:-1])))
+    rank = np.arange(len(codes)) - np.repeat(starts, np.diff(np.append(starts, len(codes))))
+    return np.sort(order[rank < n_per_group])
 
 if len(sys.argv) < 4:
     print(json.dumps({"success": False, "error": "Missing arguments"}))
@@ -16,15 +30,12 @@ filepath = sys.argv[1]
 command = sys.argv[2]
 config_file = sys.argv[3]
 
-# Load data
-try:
-    if filepath.endswith('.csv'):
-        df = pd.read_csv(filepath)
-    else:
-        df = pd.read_excel(filepath)
-except Exception as e:
-    print(json.dumps({"success": False, "error": str(e)}))
+# Load data (reuses the frame cached by the analyze step when the file is unchanged)
+loader = EnhancedAutonomousAI()
+if not loader.load_data(filepath):
+    print(json.dumps({"success": False, "error": loader.load_error or "Failed to load"}))
     sys.exit(1)
+df = loader.df
 
 # Load viz config
 try:
@@ -47,17 +58,19 @@ try:
     if data_prep == 'value_counts' or viz_type in ['pie', 'donut', 'bar', 'horizontal_bar']:
         col = viz_config.get('category') or viz_config.get('x')
         if col and col in df.columns:
-            value_counts = df[col].value_counts().head(15)
-            if viz_type in ['pie', 'donut']:
-                data = [
-                    {'category': str(idx), 'value': int(val)}
-                    for idx, val in value_counts.items()
-                ]
+            series = df[col]
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                # Sort-based counting beats pandas' hash counter on plain numbers
+                vals, counts = np.unique(series.dropna().to_numpy(), return_counts=True)
+                order = np.argsort(-counts, kind='stable')[:15]
+                value_counts = pd.Series(counts[order], index=vals[order])
             else:
-                data = [
-                    {col: str(idx), 'count': int(val)}
-                    for idx, val in value_counts.items()
-                ]
+                value_counts = series.value_counts().head(15)
+            label_key, value_key = ('category', 'value') if viz_type in ['pie', 'donut'] else (col, 'count')
+            data = pd.DataFrame({
+                label_key: value_counts.index.astype(str),
+                value_key: value_counts.values
+            }).to_dict('records')
         else:
             data = []
     
@@ -66,17 +79,28 @@ try:
         y_col = viz_config.get('y')
         
         if x_col in df.columns and y_col in df.columns:
-            df_clean = df[[x_col, y_col]].dropna()
-            df_clean[y_col] = pd.to_numeric(df_clean[y_col], errors='coerce')
-            df_clean = df_clean.dropna()
-            
+            # One selection, one dropna and one sort instead of a copy per step
+            df_clean = df[[x_col, y_col]]
+            df_clean = df_clean.assign(**{y_col: pd.to_numeric(df_clean[y_col], errors='coerce')}).dropna()
+
             try:
-                df_clean[x_col] = pd.to_datetime(df_clean[x_col])
-                df_clean = df_clean.sort_values(x_col)
-                df_grouped = df_clean.groupby(x_col)[y_col].mean().reset_index()
+                if df_clean[x_col].dtype.kind != 'M':
+                    df_clean = df_clean.assign(**{x_col: pd.to_datetime(df_clean[x_col], cache=True)})
+                df_clean = df_clean.sort_values(x_col, kind='mergesort')
+
+                # Mean per timestamp: keys are sorted, so each run of equal
+                # keys is one group and can be summed with a single reduceat
+                x = df_clean[x_col].values
+                y = df_clean[y_col].values.astype(float)
+                change = np.concatenate(([True], x[1:] != x[:-1]))
+                starts = np.nonzero(change)[0]
+                sums = np.add.reduceat(y, starts)
+                counts = np.diff(np.append(starts, len(y)))
+                means = sums / counts
+                xs = df_clean[x_col].iloc[starts[:100]]
                 data = [
-                    {x_col: str(row[x_col]), y_col: float(row[y_col])}
-                    for _, row in df_grouped.head(100).iterrows()
+                    {x_col: str(ts), y_col: float(mean)}
+                    for ts, mean in zip(xs, means[:100])
                 ]
             except:
                 data = [
@@ -154,6 +178,13 @@ try:
             
             df_clean = df_clean.dropna()
             
+            # Sample evenly across colour groups instead of taking the first rows
+            if len(df_clean) > BUBBLE_POINTS:
+                codes, uniques = pd.factorize(df_clean[color_col])
+                n_per_group = max(1, BUBBLE_POINTS // len(uniques))
+                rows = stratified_sample(codes, n_per_group)[:BUBBLE_POINTS]
+                df_clean = df_clean.iloc[rows]
+            
             data = [
                 {
                     x_col: float(row[x_col]),
@@ -161,7 +192,7 @@ try:
                     'size': float(row[size_col]),
                     'category': str(row[color_col])
                 }
-                for _, row in df_clean.head(100).iterrows()
+                for _, row in df_clean.iterrows()
             ]
         else:
             data = []
@@ -210,7 +241,7 @@ try:
     else:
         data = []
     
-    print(json.dumps({'success': True, 'data': data}))
+    emit_json({'success': True, 'data': data})
 
 except Exception as e:
     import traceback
@@ -3,6 +3,7 @@
 Fire Department Analytics Engine
 Processes data and generates insights
 """
+import heapq
 import json
 import pandas as pd
 from datetime import datetime, timedelta
@@ -83,14 +84,13 @@ class FireDeptAnalytics:
     
     def get_incidents_by_type(self):
         """Analyze incidents by type"""
-        type_counts = defaultdict(int)
-        for incident in self.incidents:
-            type_counts[incident['incident_type']] += 1
+        # Counts in first-seen order, then a stable sort so ties keep that order
+        type_counts = self.df_incidents.groupby('incident_type', sort=False).size()
+        type_counts = type_counts.sort_values(ascending=False, kind='stable')
         
-        return [
-            {"type": k, "count": v} 
-            for k, v in sorted(type_counts.items(), key=lambda x: x[1], reverse=True)
-        ]
+        return (
+            type_counts.rename_axis('type').reset_index(name='count').to_dict('records')
+        )
     
     def get_incidents_by_severity(self):
         """Analyze incidents by severity"""
@@ -105,28 +105,15 @@ class FireDeptAnalytics:
     
     def get_incidents_by_state(self):
         """Analyze incidents by state"""
-        state_data = defaultdict(lambda: {
-            'count': 0, 
-            'casualties': 0, 
-            'avg_response_time': []
-        })
-        
-        for incident in self.incidents:
-            state = incident['state']
-            state_data[state]['count'] += 1
-            state_data[state]['casualties'] += incident['casualties']
-            state_data[state]['avg_response_time'].append(incident['response_time_minutes'])
-        
-        result = []
-        for state, data in state_data.items():
-            result.append({
-                "state": state,
-                "incidents": data['count'],
-                "casualties": data['casualties'],
-                "avg_response_time": round(statistics.mean(data['avg_response_time']), 2)
-            })
+        state_data = self.df_incidents.groupby('state', sort=False).agg(
+            incidents=('incident_id', 'size'),
+            casualties=('casualties', 'sum'),
+            avg_response_time=('response_time_minutes', 'mean')
+        )
+        state_data['avg_response_time'] = state_data['avg_response_time'].round(2)
+        state_data = state_data.sort_values('incidents', ascending=False, kind='stable')
         
-        return sorted(result, key=lambda x: x['incidents'], reverse=True)
+        return state_data.reset_index().to_dict('records')
     
     def get_monthly_trends(self):
         """Get monthly incident trends"""
@@ -247,10 +234,11 @@ class FireDeptAnalytics:
         for incident in self.incidents:
             cause_counts[incident['cause']] += 1
         
+        # Partial top-10 selection instead of sorting every cause
         return [
             {"cause": k, "count": v} 
-            for k, v in sorted(cause_counts.items(), key=lambda x: x[1], reverse=True)
-        ][:10]
+            for k, v in heapq.nlargest(10, cause_counts.items(), key=lambda x: x[1])
+        ]
     
     def search_incidents(self, filters):
         """Search incidents with filters"""
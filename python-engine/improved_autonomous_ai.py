@@ -4,8 +4,56 @@ Enhanced Autonomous AI - Generates 15+ visualizations
 """
 import pandas as pd
 import numpy as np
+import hashlib
 import json
+import os
 import sys
+from itertools import chain
+import pickle_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import python_calamine  # noqa: F401  (enables pandas' 'calamine' engine)
+    HAS_CALAMINE = True
+except ImportError:
+    HAS_CALAMINE = False
+
+# .xlsx files above this size are streamed instead of loaded through pd.read_excel
+LARGE_EXCEL_BYTES = 5 * 1024 * 1024
+# Rows used to guess each column's dtype before streaming the rest
+DTYPE_SNIFF_ROWS = 200
+# Parsed frames are cached in this folder next to the uploaded file
+CACHE_DIR_NAME = '.cache'
+
+def emit_json(obj):
+    """Write obj to stdout as JSON, using orjson's C encoder when available"""
+    if orjson is None:
+        print(json.dumps(obj))
+        return
+    # Flush text already buffered on sys.stdout so it can't land after the JSON bytes
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY) + b'\n')
+    sys.stdout.buffer.flush()
+
+def _dedup_names(names):
+    """Rename repeated column names to x.1, x.2, ... the way pandas' readers do"""
+    taken = set(names)
+    counts = {}
+    result = []
+    for name in names:
+        base, count = name, counts.get(name, 0)
+        while count > 0:
+            counts[base] = count + 1
+            name = f"{base}.{count}"
+            # Skip suffixes that clash with a header elsewhere in the sheet
+            count = count + 1 if name in taken else counts.get(name, 0)
+        result.append(name)
+        counts[name] = count + 1
+    return result
 
 class EnhancedAutonomousAI:
     def __init__(self):
@@ -15,22 +63,125 @@ class EnhancedAutonomousAI:
         self.auto_visualizations = []
         self.toggles = []
         self.metadata = {}
+        self._value_counts = {}
+        self._numeric_range = {}
+        self.load_error = None
         
     def load_data(self, filepath):
         """Load data"""
         try:
             self.filepath = filepath
+            cache_path = self._cache_path(filepath)
+            cached = pickle_cache.load(cache_path)
+            if cached is not pickle_cache.MISS:
+                self.df = cached
+                return True
+            
             if filepath.endswith('.csv'):
                 self.df = pd.read_csv(filepath, encoding='utf-8')
+            elif filepath.endswith('.xlsx') and os.path.getsize(filepath) > LARGE_EXCEL_BYTES:
+                self.df = self._read_large_excel(filepath)
             else:
                 self.df = pd.read_excel(filepath, engine='openpyxl')
             
             self.df.columns = [str(col).strip() for col in self.df.columns]
+            self._save_cache(cache_path)
             return True
         except Exception as e:
+            self.load_error = str(e)
             print(f"Error: {str(e)}", file=sys.stderr)
             return False
     
+    def _cache_path(self, filepath):
+        """Cache file for the parsed frame, keyed on path, mtime and size"""
+        filepath = os.path.abspath(filepath)
+        stat = os.stat(filepath)
+        key = hashlib.sha1(f"{filepath}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:16]
+        return os.path.join(os.path.dirname(filepath), CACHE_DIR_NAME, f"{key}.pkl")
+    
+    def _save_cache(self, cache_path):
+        """Pickle the parsed frame so later runs on the same file skip parsing"""
+        try:
+            pickle_cache.save(cache_path, self.df)
+        except Exception as e:
+            print(f"Cache write failed: {str(e)}", file=sys.stderr)
+    
+    def _read_large_excel(self, filepath):
+        """Stream a big .xlsx sheet into pre-sized NumPy columns"""
+        if HAS_CALAMINE:
+            return pd.read_excel(filepath, engine='calamine')
+        
+        from openpyxl import load_workbook
+        wb = load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            ws = wb.active
+            if ws.max_row is None or ws.max_column is None:
+                # Sheet has no stored dimensions, so it can't be pre-sized
+                return pd.read_excel(filepath, engine='openpyxl')
+            
+            # The stored dimensions are only a sizing hint: some writers get them
+            # wrong, so iteration ignores them, buffers grow past max_row and
+            # rows wider than max_column fall back below
+            n_rows, n_cols = max(ws.max_row - 1, 1), ws.max_column
+            ws.reset_dimensions()
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None) or ()
+            if any(value is not None for value in header[n_cols:]):
+                return pd.read_excel(filepath, engine='openpyxl')
+            names = _dedup_names([str(header[j]) if j < len(header) and header[j] is not None else f'Unnamed: {j}'
+                                  for j in range(n_cols)])
+            
+            # Sniff dtypes from the first rows: all-numeric columns get a float
+            # buffer, everything else stays object
+            head = [row for _, row in zip(range(DTYPE_SNIFF_ROWS), rows)]
+            kinds = []
+            for j in range(n_cols):
+                values = [row[j] for row in head if j < len(row) and row[j] is not None]
+                if values and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                    kinds.append('int' if all(isinstance(v, int) for v in values) else 'float')
+                else:
+                    kinds.append('object')
+            columns = [np.full(n_rows, np.nan, dtype=object if kind == 'object' else np.float64)
+                       for kind in kinds]
+            
+            n = 0  # rows up to the last non-empty one; trailing blank rows are dropped
+            for i, row in enumerate(chain(head, rows)):
+                if any(value is not None for value in row[n_cols:]):
+                    return pd.read_excel(filepath, engine='openpyxl')
+                if i >= n_rows:
+                    # max_row understated the sheet; double the buffers
+                    columns = [np.concatenate((col, np.full(n_rows, np.nan, dtype=col.dtype))) for col in columns]
+                    n_rows *= 2
+                for j, value in enumerate(row[:n_cols]):
+                    if value is None:
+                        continue
+                    if kinds[j] != 'object' and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                        # Value doesn't fit the sniffed dtype; fall back to object
+                        columns[j] = columns[j].astype(object)
+                        kinds[j] = 'object'
+                    columns[j][i] = value
+                    n = i + 1
+        finally:
+            wb.close()
+        
+        # openpyxl hands whole-number floats to pd.read_excel as ints, so any
+        # gap-free integral numeric column ends up int64 there too
+        for j, kind in enumerate(kinds):
+            col = columns[j][:n]
+            if kind != 'object' and not np.isnan(col).any() and (col == col.astype(np.int64)).all():
+                col = col.astype(np.int64)
+            columns[j] = col
+        df = pd.DataFrame(dict(enumerate(columns)))
+        df.columns = names
+        
+        # Mixed and text columns go through the same TextParser pass as
+        # pd.read_excel, which turns numbers stored as text into numbers
+        object_cols = [name for name, kind in zip(names, kinds) if kind == 'object']
+        if object_cols and n:
+            parsed = pd.io.parsers.TextParser(df[object_cols].to_numpy().tolist(), names=object_cols).read()
+            df[object_cols] = parsed.set_axis(df.index)
+        return df.infer_objects()
+    
     def analyze_and_decide(self):
         """AI analyzes and creates ALL visualizations"""
         self._analyze_columns()
@@ -50,6 +201,22 @@ class EnhancedAutonomousAI:
                 'unique_count': unique_count,
                 'missing_pct': missing_pct
             }
+        
+        # Count categories once; viz configs and toggles reuse these
+        categorical_cols = [col for col, meta in self.metadata.items() if meta['type'] == 'categorical']
+        self._value_counts = {col: self.df[col].value_counts() for col in categorical_cols}
+        
+        # Min/max for all numeric columns in one aggregation; object columns
+        # that only parse as numbers (e.g. mixed 1 and '2') are converted first
+        numeric_cols = [col for col, meta in self.metadata.items() if meta['type'] == 'numeric']
+        if numeric_cols:
+            stats = self.df[numeric_cols].apply(pd.to_numeric).agg(['min', 'max'])
+            # Kept out of metadata, which is emitted as-is; an all-empty column
+            # has no range and gets None, since NaN isn't valid JSON
+            stats = stats.astype(float).replace({np.nan: None})
+            self._numeric_range = {
+                col: (stats.at['min', col], stats.at['max', col]) for col in numeric_cols
+            }
     
     def _detect_type(self, col):
         """Detect column type"""
@@ -282,19 +449,19 @@ class EnhancedAutonomousAI:
         
         # Category filters
         for cat_col in categorical_cols[:3]:
-            unique_values = self.df[cat_col].dropna().unique().tolist()[:20]
+            # Top-20 most frequent values, straight from the cached counts
+            options = self._value_counts[cat_col].index[:20].astype(str).tolist()
             self.toggles.append({
                 'type': 'multi_select',
                 'label': f'Filter by {cat_col}',
                 'column': cat_col,
-                'options': [str(v) for v in unique_values],
+                'options': options,
                 'description': f'Select {cat_col} values'
             })
         
         # Range sliders
         for num_col in numeric_cols[:2]:
-            min_val = float(self.df[num_col].min())
-            max_val = float(self.df[num_col].max())
+            min_val, max_val = self._numeric_range[num_col]
             self.toggles.append({
                 'type': 'range_slider',
                 'label': f'{num_col} Range',
@@ -359,4 +526,4 @@ if __name__ == "__main__":
     if command == 'analyze':
         ai.analyze_and_decide()
         results = ai.get_results()
-        print(json.dumps(results))
\ No newline at end of file
+        emit_json(results)
\ No newline at end of file
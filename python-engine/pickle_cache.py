@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+On-disk pickle cache shared by the engine scripts
+Entries are written atomically and the cache folder is trimmed after each write
+"""
+import os
+import pickle
+import time
+
+# Each cache folder is trimmed back to this size, oldest entries first
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Temp files older than this were left behind by a killed writer
+STALE_TMP_SECONDS = 60 * 60
+
+# Returned by load() when there is no usable entry
+MISS = object()
+
+def load(cache_file):
+    """Unpickle cache_file, or return MISS if it is missing or unreadable"""
+    try:
+        with open(cache_file, 'rb') as f:
+            result = pickle.load(f)
+    except Exception:
+        # Missing, truncated or written by an incompatible version; callers rebuild it
+        return MISS
+    try:
+        os.utime(cache_file)  # mark as recently used for eviction
+    except OSError:
+        pass
+    return result
+
+def save(cache_file, obj):
+    """Pickle obj to cache_file via a temp file and rename, so readers never see a partial file"""
+    cache_dir = os.path.dirname(cache_file)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except BaseException:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        raise
+    evict(cache_dir, keep=cache_file)
+
+def evict(cache_dir, max_bytes=CACHE_MAX_BYTES, keep=None):
+    """Delete least recently used entries until cache_dir fits in max_bytes (never keep)"""
+    now = time.time()
+    entries = []
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if entry.name.endswith('.tmp'):
+                    if now - stat.st_mtime > STALE_TMP_SECONDS:
+                        _remove(entry.path)
+                elif entry.name.endswith('.pkl'):
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except OSError:
+        return
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        _remove(path)
+        total -= size
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass  # already gone, e.g. evicted by another worker
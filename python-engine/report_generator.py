@@ -3,68 +3,247 @@
 Report Generation Module for Fire Department Analytics
 Generates PDF and Excel reports
 """
+import hashlib
+import io
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
+import numpy as np
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, LongTable, TableStyle, PageBreak
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
 from reportlab.lib import colors
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill
 from openpyxl.chart import BarChart, PieChart, LineChart, Reference
+from openpyxl.utils import get_column_letter
 from analytics import FireDeptAnalytics
+import pickle_cache
+
+# Shared Excel styles, created once instead of per cell
+_HEADER_FONT = Font(bold=True, color="FFFFFF")
+_HEADER_FILL = PatternFill(start_color="2c3e50", end_color="2c3e50", fill_type="solid")
+_SHEET_TITLE_FONT = Font(size=14, bold=True)
+_DASHBOARD_TITLE_FONT = Font(size=16, bold=True)
+_COUNT_FORMAT = '#,##0'
+_CURRENCY_FORMAT = '₹#,##0'
+
+# Dashboard sheet rows: (KPI key, label, number format)
+_DASHBOARD_KPIS = (
+    ('total_incidents', 'Total Incidents', _COUNT_FORMAT),
+    ('recent_incidents_30d', 'Recent Incidents (30 days)', _COUNT_FORMAT),
+    ('avg_response_time', 'Average Response Time (min)', _COUNT_FORMAT),
+    ('total_casualties', 'Total Casualties', _COUNT_FORMAT),
+    ('total_injuries', 'Total Injuries', _COUNT_FORMAT),
+    ('critical_incidents', 'Critical Incidents', _COUNT_FORMAT),
+    ('active_stations', 'Active Fire Stations', _COUNT_FORMAT),
+    ('active_vendors', 'Active Vendors', _COUNT_FORMAT),
+    ('total_property_damage', 'Total Property Damage (₹)', _CURRENCY_FORMAT),
+)
+
+# Incident fields shown on the Raw Data sheet, and how many rows it lists
+RAW_DATA_FIELDS = ('incident_id', 'timestamp', 'state', 'city', 'incident_type', 'severity',
+                   'response_time_minutes', 'casualties', 'injuries', 'property_damage_inr')
+RAW_DATA_ROWS = 100
+
+# PDF palette, parsed once
+_NAVY = colors.HexColor('#2c3e50')
+_STRIPE = colors.HexColor('#f0f0f0')
+_WHITESMOKE = colors.whitesmoke
+
+def _table_style(font_size, align='LEFT', header_padding=None):
+    """Navy-header, striped-row TableStyle used by the PDF tables"""
+    commands = [
+        ('BACKGROUND', (0, 0), (-1, 0), _NAVY),
+        ('TEXTCOLOR', (0, 0), (-1, 0), _WHITESMOKE),
+        ('ALIGN', (0, 0), (-1, -1), align),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), font_size),
+    ]
+    if header_padding is not None:
+        commands.append(('BOTTOMPADDING', (0, 0), (-1, 0), header_padding))
+    commands += [
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, _STRIPE])
+    ]
+    return TableStyle(commands)
+
+# PDF table styles, built once at import
+_KPI_TABLE_STYLE = _table_style(11, header_padding=12)
+_STD_TABLE_STYLE = _table_style(10)
+_SMALL_TABLE_STYLE = _table_style(9)
+_CENTER_TABLE_STYLE = _table_style(9, align='CENTER')
+
+# PDF table column widths
+_KPI_COL_WIDTHS = (3*inch, 2*inch)
+_TYPE_COL_WIDTHS = (2.5*inch, 1.5*inch, 1.5*inch)
+_STATE_COL_WIDTHS = (2*inch, 1.5*inch, 1.5*inch, 1.5*inch)
+_RESPONSE_COL_WIDTHS = (1.5*inch, 1.3*inch, 1.3*inch, 1.3*inch, 1.1*inch)
+_VENDOR_COL_WIDTHS = (2.5*inch, 1*inch, 1*inch, 1*inch, 1*inch)
+
+def _pct_col(counts):
+    """Share of the total for each count, in percent"""
+    total = counts.sum()
+    if not total:
+        return np.zeros(len(counts))
+    return counts * (100.0 / total)
+
+def _styled(ws, value, font=None, fill=None, number_format=None):
+    """WriteOnlyCell carrying the given (shared) style objects"""
+    cell = WriteOnlyCell(ws, value=value)
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+    if number_format is not None:
+        cell.number_format = number_format
+    return cell
+
+def _write_header(ws, values):
+    """Append a header row whose cells all share the module header style"""
+    ws.append([_styled(ws, value, font=_HEADER_FONT, fill=_HEADER_FILL) for value in values])
+
+def _set_widths(ws, widths):
+    """Set column widths left to right, starting at column A"""
+    for col_idx, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+
+def _make_chart(ws, chart_cls, title, data_range, cat_range, anchor, y_title=None):
+    """Add a chart over (min_col, min_row, max_col, max_row) data/category ranges
+    
+    The data range includes its header row, which becomes the series title.
+    """
+    chart = chart_cls()
+    chart.title = title
+    if y_title:
+        chart.y_axis.title = y_title
+    chart.add_data(Reference(ws, *data_range), titles_from_data=True)
+    chart.set_categories(Reference(ws, *cat_range))
+    ws.add_chart(chart, anchor)
+    return chart
+
+def _data_signature(data_dir):
+    """Modification times of the analytics data files"""
+    return ':'.join(
+        f"{name}@{os.path.getmtime(os.path.join(data_dir, name))}"
+        for name in sorted(os.listdir(data_dir)) if name.endswith('.json')
+    )
+
+# One FireDeptAnalytics per process, reloaded when the data files change
+_ANALYTICS = None
+_ANALYTICS_SIGNATURE = None
+
+def _shared_analytics():
+    """Process-wide FireDeptAnalytics, so each new generator skips re-parsing the data"""
+    global _ANALYTICS, _ANALYTICS_SIGNATURE
+    if _ANALYTICS is not None:
+        signature = _data_signature(_ANALYTICS.data_dir)
+        if signature != _ANALYTICS_SIGNATURE:
+            _ANALYTICS = None
+    if _ANALYTICS is None:
+        _ANALYTICS = FireDeptAnalytics()
+        _ANALYTICS_SIGNATURE = _data_signature(_ANALYTICS.data_dir)
+    return _ANALYTICS
 
 class ReportGenerator:
+    _styles_cache = {}
+    
     def __init__(self):
-        self.analytics = FireDeptAnalytics()
+        self.analytics = _shared_analytics()
         # Use relative path
-        import os
         script_dir = os.path.dirname(os.path.abspath(__file__))
         self.reports_dir = os.path.join(script_dir, '..', 'reports')
-    
-    def generate_executive_report_pdf(self, filters=None):
-        """Generate comprehensive executive PDF report"""
-        filename = f"{self.reports_dir}/Executive_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        self._analytics_cache = {}
         
-        doc = SimpleDocTemplate(filename, pagesize=letter,
+        # Raw Data sheet columns (structure-of-arrays), extracted once
+        raw_incidents = list(islice(self.analytics.incidents, RAW_DATA_ROWS))
+        self._incident_cols = {
+            field: [incident[field] for incident in raw_incidents] for field in RAW_DATA_FIELDS
+        }
+    
+    def _cached(self, name, filters=None):
+        """Run an analytics accessor once per (name, filters), persisting results to disk"""
+        filters_key = json.dumps(filters, sort_keys=True, default=str) if filters else None
+        key = (name, filters_key)
+        if key in self._analytics_cache:
+            return self._analytics_cache[key]
+        
+        # Disk key also covers the data files and the day (KPIs are relative to today)
+        digest = hashlib.sha1(
+            f"{name}|{filters_key}|{_data_signature(self.analytics.data_dir)}|{datetime.now().date()}".encode()
+        ).hexdigest()[:16]
+        cache_file = os.path.join(self.reports_dir, '.cache', f"{digest}.pkl")
+        result = pickle_cache.load(cache_file)
+        if result is pickle_cache.MISS:
+            result = getattr(self.analytics, name)()
+            try:
+                pickle_cache.save(cache_file, result)
+            except OSError:
+                pass
+        
+        self._analytics_cache[key] = result
+        return result
+    
+    @classmethod
+    def _styles(cls):
+        """Sample stylesheet plus the custom title/heading styles, built once per process"""
+        if not cls._styles_cache:
+            styles = getSampleStyleSheet()
+            cls._styles_cache['sheet'] = styles
+            cls._styles_cache['title'] = ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=24,
+                textColor=colors.HexColor('#1a1a1a'),
+                spaceAfter=30,
+                alignment=TA_CENTER,
+                fontName='Helvetica-Bold'
+            )
+            cls._styles_cache['heading'] = ParagraphStyle(
+                'CustomHeading',
+                parent=styles['Heading1'],
+                fontSize=16,
+                textColor=_NAVY,
+                spaceAfter=12,
+                fontName='Helvetica-Bold'
+            )
+        cache = cls._styles_cache
+        return cache['sheet'], cache['title'], cache['heading']
+    
+    def generate_executive_report_pdf(self, filters=None, now=None, return_bytes=False):
+        """Generate comprehensive executive PDF report
+        
+        Returns the written filename, or the raw PDF bytes without touching
+        disk when return_bytes is set.
+        """
+        now = now or datetime.now()
+        stamp_file, stamp_pretty = now.strftime('%Y%m%d_%H%M%S'), now.strftime('%B %d, %Y %I:%M %p')
+        filename = f"{self.reports_dir}/Executive_Report_{stamp_file}.pdf"
+        
+        # Render in memory and write the finished file in one go
+        buf = io.BytesIO()
+        doc = SimpleDocTemplate(buf, pagesize=letter,
                                rightMargin=72, leftMargin=72,
                                topMargin=72, bottomMargin=48)
         
-        styles = getSampleStyleSheet()
+        styles, title_style, heading_style = self._styles()
         story = []
         
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1a1a1a'),
-            spaceAfter=30,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold'
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading1'],
-            fontSize=16,
-            textColor=colors.HexColor('#2c3e50'),
-            spaceAfter=12,
-            fontName='Helvetica-Bold'
-        )
-        
         # Title
         story.append(Paragraph("Fire Department Analytics", title_style))
         story.append(Paragraph("Executive Summary Report", styles['Heading2']))
         story.append(Spacer(1, 0.3*inch))
-        story.append(Paragraph(f"Generated: {datetime.now().strftime('%B %d, %Y %I:%M %p')}", styles['Normal']))
+        story.append(Paragraph(f"Generated: {stamp_pretty}", styles['Normal']))
         story.append(Spacer(1, 0.5*inch))
         
         # KPIs Section
         story.append(Paragraph("Key Performance Indicators", heading_style))
-        kpis = self.analytics.get_dashboard_kpis()
+        kpis = self._cached('get_dashboard_kpis', filters)
         
         kpi_data = [
             ['Metric', 'Value'],
@@ -78,47 +257,30 @@ class ReportGenerator:
             ['Property Damage', f"₹{kpis['total_property_damage']:,}"]
         ]
         
-        kpi_table = Table(kpi_data, colWidths=[3*inch, 2*inch])
-        kpi_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-        ]))
+        kpi_table = Table(kpi_data, colWidths=_KPI_COL_WIDTHS, style=_KPI_TABLE_STYLE)
         story.append(kpi_table)
         story.append(Spacer(1, 0.3*inch))
         
         # Incidents by Type
         story.append(Paragraph("Incident Distribution by Type", heading_style))
-        by_type = self.analytics.get_incidents_by_type()
+        # Counted for the percentages, then walked again for the rows
+        by_type = list(self._cached('get_incidents_by_type', filters))
         type_data = [['Incident Type', 'Count', 'Percentage']]
-        total = sum(item['count'] for item in by_type)
-        for item in by_type[:8]:
-            percentage = (item['count'] / total * 100)
-            type_data.append([item['type'], str(item['count']), f"{percentage:.1f}%"])
-        
-        type_table = Table(type_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch])
-        type_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-        ]))
+        percentages = _pct_col(np.fromiter((item['count'] for item in by_type), dtype=np.int64, count=len(by_type)))
+        type_data.extend(
+            [item['type'], str(item['count']), f"{percentage:.1f}%"]
+            for item, percentage in zip(islice(by_type, 8), percentages)
+        )
+        
+        type_table = Table(type_data, colWidths=_TYPE_COL_WIDTHS, style=_STD_TABLE_STYLE)
         story.append(type_table)
         story.append(PageBreak())
         
         # State-wise Analysis
         story.append(Paragraph("State-wise Analysis", heading_style))
-        by_state = self.analytics.get_incidents_by_state()
+        by_state = self._cached('get_incidents_by_state', filters)
         state_data = [['State', 'Incidents', 'Casualties', 'Avg Response Time']]
-        for item in by_state[:10]:
+        for item in by_state:
             state_data.append([
                 item['state'], 
                 str(item['incidents']), 
@@ -126,22 +288,14 @@ class ReportGenerator:
                 f"{item['avg_response_time']} min"
             ])
         
-        state_table = Table(state_data, colWidths=[2*inch, 1.5*inch, 1.5*inch, 1.5*inch])
-        state_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-        ]))
+        # Every state is listed, so let the table split across pages with its header
+        state_table = LongTable(state_data, colWidths=_STATE_COL_WIDTHS, repeatRows=1, style=_STD_TABLE_STYLE)
         story.append(state_table)
         story.append(Spacer(1, 0.3*inch))
         
         # Response Time Analysis
         story.append(Paragraph("Response Time Analysis", heading_style))
-        response_analysis = self.analytics.get_response_time_analysis()
+        response_analysis = self._cached('get_response_time_analysis', filters)
         response_data = [['Severity', 'Avg Time', 'Min Time', 'Max Time', 'Count']]
         for item in response_analysis:
             response_data.append([
@@ -152,24 +306,15 @@ class ReportGenerator:
                 str(item['count'])
             ])
         
-        response_table = Table(response_data, colWidths=[1.5*inch, 1.3*inch, 1.3*inch, 1.3*inch, 1.1*inch])
-        response_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-        ]))
+        response_table = Table(response_data, colWidths=_RESPONSE_COL_WIDTHS, style=_CENTER_TABLE_STYLE)
         story.append(response_table)
         story.append(PageBreak())
         
         # Vendor Performance
         story.append(Paragraph("Top Vendor Performance", heading_style))
-        vendors = self.analytics.get_vendor_performance()
+        vendors = self._cached('get_vendor_performance', filters)
         vendor_data = [['Vendor Name', 'Deliveries', 'On-Time %', 'Quality', 'Defects']]
-        for vendor in vendors[:10]:
+        for vendor in islice(vendors, 10):
             vendor_data.append([
                 vendor['vendor_name'][:30],
                 str(vendor['total_deliveries']),
@@ -178,50 +323,46 @@ class ReportGenerator:
                 str(vendor['total_defects'])
             ])
         
-        vendor_table = Table(vendor_data, colWidths=[2.5*inch, 1*inch, 1*inch, 1*inch, 1*inch])
-        vendor_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c3e50')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0f0f0')])
-        ]))
+        vendor_table = Table(vendor_data, colWidths=_VENDOR_COL_WIDTHS, style=_SMALL_TABLE_STYLE)
         story.append(vendor_table)
         
         # Build PDF
         doc.build(story)
+        data = buf.getvalue()
+        if return_bytes:
+            return data
+        with open(filename, 'wb') as f:
+            f.write(data)
         return filename
     
-    def generate_excel_report(self, filters=None):
+    def generate_excel_report(self, filters=None, now=None):
         """Generate comprehensive Excel report with charts"""
-        filename = f"{self.reports_dir}/Analytics_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        
-        wb = Workbook()
+        now = now or datetime.now()
+        stamp_file, stamp_pretty = now.strftime('%Y%m%d_%H%M%S'), now.strftime('%B %d, %Y %I:%M %p')
+        filename = f"{self.reports_dir}/Analytics_Report_{stamp_file}.xlsx"
         
-        # Remove default sheet
-        wb.remove(wb.active)
+        # Write-only workbook: rows stream straight to the sheet XML
+        wb = Workbook(write_only=True)
         
         # 1. Dashboard Sheet
         ws_dashboard = wb.create_sheet("Dashboard")
-        self._create_dashboard_sheet(ws_dashboard)
+        self._create_dashboard_sheet(ws_dashboard, filters, stamp_pretty)
         
         # 2. Incidents Sheet
         ws_incidents = wb.create_sheet("Incidents Analysis")
-        self._create_incidents_sheet(ws_incidents)
+        self._create_incidents_sheet(ws_incidents, filters)
         
         # 3. State Analysis Sheet
         ws_states = wb.create_sheet("State Analysis")
-        self._create_state_sheet(ws_states)
+        self._create_state_sheet(ws_states, filters)
         
         # 4. Vendor Performance Sheet
         ws_vendors = wb.create_sheet("Vendor Performance")
-        self._create_vendor_sheet(ws_vendors)
+        self._create_vendor_sheet(ws_vendors, filters)
         
         # 5. Monthly Trends Sheet
         ws_trends = wb.create_sheet("Monthly Trends")
-        self._create_trends_sheet(ws_trends)
+        self._create_trends_sheet(ws_trends, filters)
         
         # 6. Raw Data Sheet
         ws_raw = wb.create_sheet("Raw Data")
@@ -230,230 +371,162 @@ class ReportGenerator:
         wb.save(filename)
         return filename
     
-    def _create_dashboard_sheet(self, ws):
+    # Write-only sheets only accept whole rows, and column widths must be set
+    # before the first row is appended.
+    
+    def _create_dashboard_sheet(self, ws, filters=None, generated=None):
         """Create dashboard KPIs sheet"""
-        kpis = self.analytics.get_dashboard_kpis()
+        kpis = self._cached('get_dashboard_kpis', filters)
+        
+        # Adjust column widths
+        _set_widths(ws, [35, 20])
         
         # Title
-        ws['A1'] = "Fire Department Analytics Dashboard"
-        ws['A1'].font = Font(size=16, bold=True)
-        ws.merge_cells('A1:D1')
+        ws.append([_styled(ws, "Fire Department Analytics Dashboard", font=_DASHBOARD_TITLE_FONT)])
+        ws.merged_cells.add('A1:D1')
         
         # Date
-        ws['A2'] = f"Generated: {datetime.now().strftime('%B %d, %Y %I:%M %p')}"
-        ws.merge_cells('A2:D2')
+        ws.append([f"Generated: {generated or datetime.now().strftime('%B %d, %Y %I:%M %p')}"])
+        ws.merged_cells.add('A2:D2')
+        ws.append([])
         
         # Headers
-        ws['A4'] = "Key Performance Indicator"
-        ws['B4'] = "Value"
-        ws['A4'].font = Font(bold=True, color="FFFFFF")
-        ws['B4'].font = Font(bold=True, color="FFFFFF")
-        ws['A4'].fill = PatternFill(start_color="2c3e50", end_color="2c3e50", fill_type="solid")
-        ws['B4'].fill = PatternFill(start_color="2c3e50", end_color="2c3e50", fill_type="solid")
+        _write_header(ws, ["Key Performance Indicator", "Value"])
         
         # KPIs
-        row = 5
-        kpi_labels = {
-            'total_incidents': 'Total Incidents',
-            'recent_incidents_30d': 'Recent Incidents (30 days)',
-            'avg_response_time': 'Average Response Time (min)',
-            'total_casualties': 'Total Casualties',
-            'total_injuries': 'Total Injuries',
-            'critical_incidents': 'Critical Incidents',
-            'active_stations': 'Active Fire Stations',
-            'active_vendors': 'Active Vendors',
-            'total_property_damage': 'Total Property Damage (₹)'
-        }
-        
-        for key, label in kpi_labels.items():
-            ws[f'A{row}'] = label
-            ws[f'B{row}'] = kpis[key]
-            ws[f'B{row}'].number_format = '#,##0' if 'damage' not in key else '₹#,##0'
-            row += 1
-        
-        # Adjust column widths
-        ws.column_dimensions['A'].width = 35
-        ws.column_dimensions['B'].width = 20
+        for key, label, number_format in _DASHBOARD_KPIS:
+            ws.append([label, _styled(ws, kpis[key], number_format=number_format)])
     
-    def _create_incidents_sheet(self, ws):
+    def _create_incidents_sheet(self, ws, filters=None):
         """Create incidents analysis sheet"""
-        # Headers
-        ws['A1'] = "Incident Type Analysis"
-        ws['A1'].font = Font(size=14, bold=True)
-        ws.merge_cells('A1:D1')
+        _set_widths(ws, [25, 15, 15])
         
-        ws['A3'] = "Incident Type"
-        ws['B3'] = "Count"
-        ws['C3'] = "Percentage"
-        for cell in ['A3', 'B3', 'C3']:
-            ws[cell].font = Font(bold=True, color="FFFFFF")
-            ws[cell].fill = PatternFill(start_color="2c3e50", end_color="2c3e50", fill_type="solid")
+        # Headers
+        ws.append([_styled(ws, "Incident Type Analysis", font=_SHEET_TITLE_FONT)])
+        ws.merged_cells.add('A1:D1')
+        ws.append([])
+        _write_header(ws, ["Incident Type", "Count", "Percentage"])
         
         # Data
-        by_type = self.analytics.get_incidents_by_type()
-        total = sum(item['count'] for item in by_type)
+        # Counted for the percentages, then walked again for the rows
+        by_type = list(self._cached('get_incidents_by_type', filters))
+        percentages = _pct_col(np.fromiter((item['count'] for item in by_type), dtype=np.int64, count=len(by_type)))
         
         row = 4
-        for item in by_type:
-            ws[f'A{row}'] = item['type']
-            ws[f'B{row}'] = item['count']
-            ws[f'C{row}'] = f"{item['count']/total*100:.1f}%"
+        for item, percentage in zip(by_type, percentages):
+            ws.append([item['type'], item['count'], f"{percentage:.1f}%"])
             row += 1
         
         # Add chart
-        chart = PieChart()
-        chart.title = "Incident Distribution by Type"
-        labels = Reference(ws, min_col=1, min_row=4, max_row=row-1)
-        data = Reference(ws, min_col=2, min_row=3, max_row=row-1)
-        chart.add_data(data, titles_from_data=True)
-        chart.set_categories(labels)
-        ws.add_chart(chart, "E3")
-        
-        ws.column_dimensions['A'].width = 25
-        ws.column_dimensions['B'].width = 15
-        ws.column_dimensions['C'].width = 15
+        _make_chart(ws, PieChart, "Incident Distribution by Type",
+                    (2, 3, 2, row-1), (1, 4, 1, row-1), "E3")
     
-    def _create_state_sheet(self, ws):
+    def _create_state_sheet(self, ws, filters=None):
         """Create state analysis sheet"""
-        ws['A1'] = "State-wise Analysis"
-        ws['A1'].font = Font(size=14, bold=True)
-        ws.merge_cells('A1:E1')
+        _set_widths(ws, [20] * 4)
+        
+        ws.append([_styled(ws, "State-wise Analysis", font=_SHEET_TITLE_FONT)])
+        ws.merged_cells.add('A1:E1')
+        ws.append([])
         
         # Headers
         headers = ['State', 'Incidents', 'Casualties', 'Avg Response Time (min)']
-        for col, header in enumerate(headers, start=1):
-            cell = ws.cell(row=3, column=col, value=header)
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="2c3e50", end_color="2c3e50", fill_type="solid")
+        _write_header(ws, headers)
         
         # Data
-        by_state = self.analytics.get_incidents_by_state()
+        by_state = self._cached('get_incidents_by_state', filters)
         row = 4
         for item in by_state:
-            ws[f'A{row}'] = item['state']
-            ws[f'B{row}'] = item['incidents']
-            ws[f'C{row}'] = item['casualties']
-            ws[f'D{row}'] = item['avg_response_time']
+            ws.append([item['state'], item['incidents'], item['casualties'], item['avg_response_time']])
             row += 1
         
         # Add bar chart
-        chart = BarChart()
-        chart.title = "Incidents by State"
-        chart.y_axis.title = "Number of Incidents"
-        
-        data = Reference(ws, min_col=2, min_row=3, max_row=row-1)
-        cats = Reference(ws, min_col=1, min_row=4, max_row=row-1)
-        chart.add_data(data, titles_from_data=True)
-        chart.set_categories(cats)
-        ws.add_chart(chart, "F3")
-        
-        for col in ['A', 'B', 'C', 'D']:
-            ws.column_dimensions[col].width = 20
+        _make_chart(ws, BarChart, "Incidents by State",
+                    (2, 3, 2, row-1), (1, 4, 1, row-1), "F3",
+                    y_title="Number of Incidents")
     
-    def _create_vendor_sheet(self, ws):
+    def _create_vendor_sheet(self, ws, filters=None):
         """Create vendor performance sheet"""
-        ws['A1'] = "Vendor Performance Analysis"
-        ws['A1'].font = Font(size=14, bold=True)
-        ws.merge_cells('A1:F1')
+        _set_widths(ws, [35, 25] + [15] * 4)
+        
+        ws.append([_styled(ws, "Vendor Performance Analysis", font=_SHEET_TITLE_FONT)])
+        ws.merged_cells.add('A1:F1')
+        ws.append([])
         
         headers = ['Vendor Name', 'Type', 'Deliveries', 'On-Time %', 'Quality Score', 'Defects']
-        for col, header in enumerate(headers, start=1):
-            cell = ws.cell(row=3, column=col, value=header)
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="2c3e50", end_color="2c3e50", fill_type="solid")
+        _write_header(ws, headers)
         
-        vendors = self.analytics.get_vendor_performance()
-        row = 4
+        vendors = self._cached('get_vendor_performance', filters)
         for vendor in vendors:
-            ws[f'A{row}'] = vendor['vendor_name']
-            ws[f'B{row}'] = vendor['vendor_type']
-            ws[f'C{row}'] = vendor['total_deliveries']
-            ws[f'D{row}'] = vendor['on_time_percentage']
-            ws[f'E{row}'] = vendor['avg_quality_score']
-            ws[f'F{row}'] = vendor['total_defects']
-            row += 1
-        
-        ws.column_dimensions['A'].width = 35
-        ws.column_dimensions['B'].width = 25
-        for col in ['C', 'D', 'E', 'F']:
-            ws.column_dimensions[col].width = 15
+            ws.append([
+                vendor['vendor_name'],
+                vendor['vendor_type'],
+                vendor['total_deliveries'],
+                vendor['on_time_percentage'],
+                vendor['avg_quality_score'],
+                vendor['total_defects']
+            ])
     
-    def _create_trends_sheet(self, ws):
+    def _create_trends_sheet(self, ws, filters=None):
         """Create monthly trends sheet"""
-        ws['A1'] = "Monthly Trends"
-        ws['A1'].font = Font(size=14, bold=True)
-        ws.merge_cells('A1:C1')
+        _set_widths(ws, [18] * 3)
+        
+        ws.append([_styled(ws, "Monthly Trends", font=_SHEET_TITLE_FONT)])
+        ws.merged_cells.add('A1:C1')
+        ws.append([])
         
         headers = ['Month', 'Incidents', 'Casualties']
-        for col, header in enumerate(headers, start=1):
-            cell = ws.cell(row=3, column=col, value=header)
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="2c3e50", end_color="2c3e50", fill_type="solid")
+        _write_header(ws, headers)
         
-        trends = self.analytics.get_monthly_trends()
+        trends = self._cached('get_monthly_trends', filters)
         row = 4
         for item in trends:
-            ws[f'A{row}'] = item['month']
-            ws[f'B{row}'] = item['incidents']
-            ws[f'C{row}'] = item['casualties']
+            ws.append([item['month'], item['incidents'], item['casualties']])
             row += 1
         
         # Add line chart
-        chart = LineChart()
-        chart.title = "Monthly Incident Trends"
-        chart.y_axis.title = "Count"
-        
-        data = Reference(ws, min_col=2, min_row=3, max_col=3, max_row=row-1)
-        cats = Reference(ws, min_col=1, min_row=4, max_row=row-1)
-        chart.add_data(data, titles_from_data=True)
-        chart.set_categories(cats)
-        ws.add_chart(chart, "E3")
-        
-        for col in ['A', 'B', 'C']:
-            ws.column_dimensions[col].width = 18
+        _make_chart(ws, LineChart, "Monthly Incident Trends",
+                    (2, 3, 3, row-1), (1, 4, 1, row-1), "E3",
+                    y_title="Count")
     
     def _create_raw_data_sheet(self, ws):
         """Create raw incident data sheet"""
-        ws['A1'] = "Raw Incident Data"
-        ws['A1'].font = Font(size=14, bold=True)
-        
         headers = ['Incident ID', 'Date', 'State', 'City', 'Type', 'Severity', 
                   'Response Time', 'Casualties', 'Injuries', 'Property Damage']
         
-        for col, header in enumerate(headers, start=1):
-            cell = ws.cell(row=3, column=col, value=header)
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="2c3e50", end_color="2c3e50", fill_type="solid")
+        _set_widths(ws, [18] * len(headers))
         
-        row = 4
-        for incident in self.analytics.incidents[:100]:  # Limit to 100 for demo
-            ws[f'A{row}'] = incident['incident_id']
-            ws[f'B{row}'] = incident['timestamp']
-            ws[f'C{row}'] = incident['state']
-            ws[f'D{row}'] = incident['city']
-            ws[f'E{row}'] = incident['incident_type']
-            ws[f'F{row}'] = incident['severity']
-            ws[f'G{row}'] = incident['response_time_minutes']
-            ws[f'H{row}'] = incident['casualties']
-            ws[f'I{row}'] = incident['injuries']
-            ws[f'J{row}'] = incident['property_damage_inr']
-            row += 1
+        ws.append([_styled(ws, "Raw Incident Data", font=_SHEET_TITLE_FONT)])
+        ws.append([])
+        _write_header(ws, headers)
         
-        for col in ws.columns:
-            ws.column_dimensions[col[0].column_letter].width = 18
+        # Limited to RAW_DATA_ROWS for demo
+        for row_values in zip(*self._incident_cols.values()):
+            ws.append(row_values)
+
+def _make_pdf(filters=None, now=None):
+    """Worker entry point: build the PDF with a generator local to the process"""
+    return ReportGenerator().generate_executive_report_pdf(filters, now)
+
+def _make_xlsx(filters=None, now=None):
+    """Worker entry point: build the Excel report with a generator local to the process"""
+    return ReportGenerator().generate_excel_report(filters, now)
 
 def main():
     """Test report generation"""
     print("Generating reports...")
-    generator = ReportGenerator()
+    now = datetime.now()  # one timestamp so both files share it
     
-    # Generate PDF
-    pdf_file = generator.generate_executive_report_pdf()
-    print(f"✓ PDF Report: {pdf_file}")
-    
-    # Generate Excel
-    excel_file = generator.generate_excel_report()
-    print(f"✓ Excel Report: {excel_file}")
+    # PDF and Excel are independent, so build them in parallel processes
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        pdf_future = pool.submit(_make_pdf, None, now)
+        excel_future = pool.submit(_make_xlsx, None, now)
+        
+        pdf_file = pdf_future.result()
+        print(f"✓ PDF Report: {pdf_file}")
+        
+        excel_file = excel_future.result()
+        print(f"✓ Excel Report: {excel_file}")
     
     print("\n✅ Reports generated successfully!")
 
@@ -5,22 +5,43 @@ Smart Analytics Report Generator
 - Makes predictions
 - Provides insights and recommendations
 """
+import io
 import json
 import sys
 import os
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-from reportlab.lib import colors
-from scipy import stats
-from sklearn.linear_model import LinearRegression
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from functools import cached_property
+
+# Optional faster readers; the default pandas engines are used without them
+try:
+    import pyarrow  # noqa: F401  (enables pandas' 'pyarrow' CSV engine)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import python_calamine  # noqa: F401  (enables pandas' 'calamine' Excel engine)
+    HAS_CALAMINE = True
+except ImportError:
+    HAS_CALAMINE = False
+
+def _has_arrow_dates(df):
+    """True if the Arrow CSV reader typed any column as a date, time or timestamp"""
+    for _, series in df.items():
+        if series.dtype.kind == 'M':
+            return True
+        if series.dtype == object:
+            first = series.first_valid_index()
+            if first is not None and isinstance(series.loc[first], (date, time)):
+                return True
+    return False
 
 class SmartReportGenerator:
+    _styles_cache = {}
+    
     def __init__(self, filepath):
         self.filepath = filepath
         self.df = None
@@ -29,19 +50,31 @@ class SmartReportGenerator:
         self.trends = []
         self.recommendations = []
         
+        # Numeric block the analyses share, filled once the data is loaded
+        self._A = None  # numeric columns holding any data, column-major float64
+        self._M = None  # its not-NaN mask
+        self._cols = []  # names of the _A columns
+        self._counts = None  # non-NaN values per _A column
+        
     def load_and_analyze(self):
         """Load data and perform comprehensive analysis"""
         try:
-            if self.filepath.endswith('.csv'):
-                self.df = pd.read_csv(self.filepath)
-            else:
-                self.df = pd.read_excel(self.filepath)
+            self.df = self._read_file()
+            self._index_columns()
             
-            # Perform analyses
-            self.analyze_trends()
-            self.detect_patterns()
+            # Trends, patterns and insights only read the shared arrays, and their
+            # NumPy/BLAS work releases the GIL, so run them side by side and merge
+            # the results in the original order afterwards
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                trends = pool.submit(self._fit_trends)
+                patterns = pool.submit(self._pattern_insights)
+                insights = pool.submit(self._data_insights)
+                self.trends.extend(trends.result())
+                self.insights.extend(patterns.result())
+                self.insights.extend(insights.result())
+            
+            # Predictions and recommendations build on the trends
             self.make_predictions()
-            self.generate_insights()
             self.generate_recommendations()
             
             return True
@@ -49,69 +82,229 @@ class SmartReportGenerator:
             print(f"Error loading data: {str(e)}")
             return False
     
+    def _read_file(self):
+        """Read the CSV/Excel file, preferring the multi-threaded Arrow / Rust readers"""
+        if self.filepath.endswith('.csv'):
+            if HAS_PYARROW:
+                try:
+                    df = pd.read_csv(self.filepath, engine='pyarrow')
+                    # Arrow infers ISO dates and times that the C engine keeps as
+                    # text, which would shift the Date/Time vs Text counts; those
+                    # files are read with the C engine instead
+                    if not _has_arrow_dates(df):
+                        return df
+                except Exception:
+                    pass  # input the Arrow parser rejects; the C engine is more lenient
+            return pd.read_csv(self.filepath)
+        if HAS_CALAMINE:
+            return pd.read_excel(self.filepath, engine='calamine')
+        return pd.read_excel(self.filepath)
+    
+    @cached_property
+    def n_rows(self):
+        return len(self.df)
+    
+    @cached_property
+    def n_cols(self):
+        return len(self.df.columns)
+    
+    @cached_property
+    def numeric_cols(self):
+        return list(self.df.select_dtypes(include=[np.number]).columns)
+    
+    @cached_property
+    def datetime_cols(self):
+        return list(self.df.select_dtypes(include=['datetime64']).columns)
+    
+    @cached_property
+    def object_cols(self):
+        return list(self.df.select_dtypes(include=['object']).columns)
+    
+    @cached_property
+    def numeric_array(self):
+        """All numeric columns as one column-major float64 matrix (NaN for missing)"""
+        return np.asfortranarray(self.df[self.numeric_cols].to_numpy(dtype=np.float64, na_value=np.nan))
+    
+    @cached_property
+    def null_per_col(self):
+        return self.df.isna().sum()
+    
+    @cached_property
+    def null_total(self):
+        return int(self.null_per_col.sum())
+    
+    @cached_property
+    def completeness_pct(self):
+        n_cells = self.n_rows * self.n_cols
+        if n_cells == 0:
+            # A header-only file has nothing missing
+            return 100.0
+        return (1 - self.null_total / n_cells) * 100
+    
+    def _index_columns(self):
+        """Build the numeric block and its mask once, before the analyses share them"""
+        self._A = self.numeric_array
+        self._M = ~np.isnan(self._A)
+        
+        # All-NaN columns can't yield a trend, pattern or correlation, so the
+        # analyses only ever see columns that hold data
+        self._counts = self._M.sum(axis=0)
+        present = self._counts > 0
+        self._cols = [col for col, has_data in zip(self.numeric_cols, present) if has_data]
+        if not present.all():
+            self._A = np.asfortranarray(self._A[:, present])
+            self._M = np.asfortranarray(self._M[:, present])
+            self._counts = self._counts[present]
+    
     def analyze_trends(self):
         """Analyze trends in numeric columns"""
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        self.trends.extend(self._fit_trends())
+    
+    def _fit_trends(self):
+        """Trend rows for the numeric columns"""
+        trends = []
+        
+        # Need at least 5 data points
+        keep = np.flatnonzero(self._counts > 5)
+        if len(keep) == 0:
+            return trends
+        
+        A, M, n = self._A[:, keep], self._M[:, keep], self._counts[keep]
+        
+        # Least-squares fit of every column against its own 0..n-1 index
+        # (NaNs dropped), done for all columns at once with centred sums
+        x = np.cumsum(M, axis=0) - 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            y_mean = np.where(M, A, 0.0).sum(axis=0) / n
+            dx = np.where(M, x - (n - 1) / 2, 0.0)
+            dy = np.where(M, A - y_mean, 0.0)
+            sxx = n * (n * n - 1) / 12.0
+            sxy = (dx * dy).sum(axis=0)
+            syy = (dy * dy).sum(axis=0)
+            slopes = sxy / sxx
+            r_values = (sxy / np.sqrt(sxx * syy)).clip(-1.0, 1.0)  # NaN for constant columns, like linregress
+            stds = np.sqrt(syy / (n - 1))
+        mins = A.min(axis=0, where=M, initial=np.inf)
+        maxs = A.max(axis=0, where=M, initial=-np.inf)
+        
+        for k, col_idx in enumerate(keep):
+            slope, r_value = float(slopes[k]), float(r_values[k])
+            
+            trend_direction = "increasing" if slope > 0 else "decreasing"
+            strength = "strong" if abs(r_value) > 0.7 else "moderate" if abs(r_value) > 0.4 else "weak"
+            
+            trends.append({
+                'column': self._cols[col_idx],
+                'direction': trend_direction,
+                'strength': strength,
+                'slope': slope,
+                'r_squared': r_value ** 2,
+                'mean': float(y_mean[k]),
+                'std': float(stds[k]),
+                'min': float(mins[k]),
+                'max': float(maxs[k])
+            })
         
-        for col in numeric_cols:
-            if self.df[col].notna().sum() > 5:  # Need at least 5 data points
-                values = self.df[col].dropna()
-                
-                # Calculate trend
-                x = np.arange(len(values))
-                y = values.values
-                
-                if len(x) > 1:
-                    slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
-                    
-                    trend_direction = "increasing" if slope > 0 else "decreasing"
-                    strength = "strong" if abs(r_value) > 0.7 else "moderate" if abs(r_value) > 0.4 else "weak"
-                    
-                    self.trends.append({
-                        'column': col,
-                        'direction': trend_direction,
-                        'strength': strength,
-                        'slope': slope,
-                        'r_squared': r_value ** 2,
-                        'mean': values.mean(),
-                        'std': values.std(),
-                        'min': values.min(),
-                        'max': values.max()
-                    })
+        return trends
     
     def detect_patterns(self):
         """Detect patterns and anomalies"""
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
-        
-        for col in numeric_cols:
-            values = self.df[col].dropna()
+        self.insights.extend(self._pattern_insights())
+    
+    def _pattern_insights(self):
+        """Outlier and cyclical-pattern insights for the numeric columns"""
+        insights = []
+        numeric_cols = self._cols
+        A, M, counts = self._A, self._M, self._counts
+        
+        # Quartiles and outlier masks for every eligible column in one pass
+        keep = np.flatnonzero(counts > 10)
+        if len(keep) == 0:
+            return insights
+        A, M = A[:, keep], M[:, keep]
+        Q1, Q3 = self._quartiles(A, counts[keep])
+        IQR = Q3 - Q1
+        outlier_mask = (A < Q1 - 1.5 * IQR) | (A > Q3 + 1.5 * IQR)
+        n_outliers = outlier_mask.sum(axis=0)
+        outlier_min = A.min(axis=0, where=outlier_mask, initial=np.inf)
+        outlier_max = A.max(axis=0, where=outlier_mask, initial=-np.inf)
+        autocorr_7 = self._lag_autocorr(A, M, 7)
+        
+        for k, col_idx in enumerate(keep):
+            col = numeric_cols[col_idx]
             
-            if len(values) > 10:
-                # Detect outliers
-                Q1 = values.quantile(0.25)
-                Q3 = values.quantile(0.75)
-                IQR = Q3 - Q1
-                outliers = values[(values < Q1 - 1.5 * IQR) | (values > Q3 + 1.5 * IQR)]
-                
-                if len(outliers) > 0:
-                    self.insights.append({
-                        'type': 'outlier',
+            if n_outliers[k] > 0:
+                insights.append({
+                    'type': 'outlier',
+                    'column': col,
+                    'message': f"Found {n_outliers[k]} outlier(s) in {col}",
+                    'detail': f"Range: {outlier_min[k]:.2f} to {outlier_max[k]:.2f}"
+                })
+            
+            # Check for seasonality (if enough data)
+            if counts[col_idx] > 30:
+                # Simple seasonality check
+                autocorr = autocorr_7[k]
+                if abs(autocorr) > 0.5:
+                    insights.append({
+                        'type': 'pattern',
                         'column': col,
-                        'message': f"Found {len(outliers)} outlier(s) in {col}",
-                        'detail': f"Range: {outliers.min():.2f} to {outliers.max():.2f}"
+                        'message': f"Detected cyclical pattern in {col}",
+                        'detail': f"7-day autocorrelation: {autocorr:.2f}"
                     })
-                
-                # Check for seasonality (if enough data)
-                if len(values) > 30:
-                    # Simple seasonality check
-                    autocorr = pd.Series(values.values).autocorr(lag=7)
-                    if abs(autocorr) > 0.5:
-                        self.insights.append({
-                            'type': 'pattern',
-                            'column': col,
-                            'message': f"Detected cyclical pattern in {col}",
-                            'detail': f"7-day autocorrelation: {autocorr:.2f}"
-                        })
+        
+        return insights
+    
+    @staticmethod
+    def _quartiles(A, counts):
+        """Linear-interpolated 25th/75th percentiles per column of A, ignoring NaNs
+        
+        Columns sharing a non-NaN count are handled by one np.partition call,
+        which places only the four order statistics needed instead of sorting.
+        NaNs partition to the end, so the first counts[k] rows are the values.
+        """
+        q = np.empty((2, A.shape[1]))
+        for n in np.unique(counts):
+            group = np.flatnonzero(counts == n)
+            pos = (n - 1) * np.array([0.25, 0.75])
+            lo = np.floor(pos).astype(int)
+            hi = np.minimum(lo + 1, n - 1)
+            part = np.partition(A[:, group], np.unique(np.concatenate((lo, hi))), axis=0)
+            a, b = part[lo], part[hi]
+            t = (pos - lo)[:, None]
+            # Same two-sided lerp as np.percentile, so results match it exactly
+            diff = b - a
+            q[:, group] = np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+        return q[0], q[1]
+    
+    @staticmethod
+    def _lag_autocorr(A, M, lag):
+        """Per-column lag autocorrelation of A, NaNs dropped (Series.autocorr for every column)"""
+        # Pack each column's values to the top so lag pairs are lag apart in the packed order
+        packed = np.full_like(A, np.nan)
+        packed[(np.cumsum(M, axis=0) - 1)[M], np.nonzero(M)[1]] = A[M]
+        
+        a, b = packed[:-lag], packed[lag:]
+        pairs = ~np.isnan(a) & ~np.isnan(b)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            n = pairs.sum(axis=0)
+            a = np.where(pairs, a - np.where(pairs, a, 0.0).sum(axis=0) / n, 0.0)
+            b = np.where(pairs, b - np.where(pairs, b, 0.0).sum(axis=0) / n, 0.0)
+            return (a * b).sum(axis=0) / np.sqrt((a * a).sum(axis=0) * (b * b).sum(axis=0))
+    
+    @staticmethod
+    def _skewness(A, M):
+        """Bias-corrected skew per column of A over the M entries, as Series.skew"""
+        n = M.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            d = np.where(M, A - np.where(M, A, 0.0).sum(axis=0) / n, 0.0)
+            m2 = (d * d).sum(axis=0)
+            m3 = (d * d * d).sum(axis=0)
+            m2[np.abs(m2) < 1e-14] = 0  # pandas treats float noise as zero variance
+            skew = (n * (n - 1) ** 0.5 / (n - 2)) * (m3 / m2 ** 1.5)
+        skew = np.where(m2 == 0, 0.0, skew)
+        skew[n < 3] = np.nan
+        return skew
     
     def make_predictions(self):
         """Make future predictions based on trends"""
@@ -138,46 +331,57 @@ class SmartReportGenerator:
     
     def generate_insights(self):
         """Generate key insights from data"""
+        self.insights.extend(self._data_insights())
+    
+    def _data_insights(self):
+        """Correlation and distribution insights for the numeric columns"""
+        insights = []
         
         # Correlation insights
-        numeric_df = self.df.select_dtypes(include=[np.number])
-        if len(numeric_df.columns) > 1:
-            corr_matrix = numeric_df.corr()
+        if len(self._cols) > 1:
+            if not self._M.all():
+                # Missing values need pandas' pairwise-complete correlation
+                corr_matrix = self.df[self._cols].corr().to_numpy()
+            else:
+                # No gaps: one BLAS-backed pass (constant columns give NaN, as in pandas).
+                # Centring in float64 first keeps large-magnitude columns (IDs,
+                # phone numbers) exact; the product itself then runs in float32,
+                # halving its memory traffic, which is ample for a 0.7 threshold.
+                centred = (self._A - self._A.mean(axis=0)).astype(np.float32)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    corr_matrix = np.corrcoef(centred, rowvar=False, dtype=np.float32).astype(np.float64)
+            names = np.asarray(self._cols, dtype=object)
             
-            # Find strong correlations
-            for i in range(len(corr_matrix.columns)):
-                for j in range(i+1, len(corr_matrix.columns)):
-                    corr_value = corr_matrix.iloc[i, j]
-                    
-                    if abs(corr_value) > 0.7:
-                        col1 = corr_matrix.columns[i]
-                        col2 = corr_matrix.columns[j]
-                        
-                        relationship = "positively" if corr_value > 0 else "negatively"
-                        
-                        self.insights.append({
-                            'type': 'correlation',
-                            'column': f"{col1} & {col2}",
-                            'message': f"{col1} and {col2} are {relationship} correlated",
-                            'detail': f"Correlation coefficient: {corr_value:.2f}"
-                        })
+            # Find strong correlations among the upper-triangle pairs (row-major,
+            # like the old double loop); Python only touches the strong ones
+            iu, ju = np.triu_indices(len(names), k=1)
+            vals = corr_matrix[iu, ju]
+            strong = np.abs(vals) > 0.7
+            for col1, col2, corr_value in zip(names[iu[strong]], names[ju[strong]], vals[strong]):
+                relationship = "positively" if corr_value > 0 else "negatively"
+                
+                insights.append({
+                    'type': 'correlation',
+                    'column': f"{col1} & {col2}",
+                    'message': f"{col1} and {col2} are {relationship} correlated",
+                    'detail': f"Correlation coefficient: {corr_value:.2f}"
+                })
         
         # Distribution insights
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
-            values = self.df[col].dropna()
-            
-            if len(values) > 5:
-                skewness = values.skew()
-                
-                if abs(skewness) > 1:
-                    direction = "right" if skewness > 0 else "left"
-                    self.insights.append({
-                        'type': 'distribution',
-                        'column': col,
-                        'message': f"{col} shows {direction}-skewed distribution",
-                        'detail': f"Skewness: {skewness:.2f}"
-                    })
+        eligible = np.flatnonzero(self._counts > 5)
+        skews = self._skewness(self._A[:, eligible], self._M[:, eligible])
+        for col_idx, skewness in zip(eligible, skews):
+            if abs(skewness) > 1:
+                col = self._cols[col_idx]
+                direction = "right" if skewness > 0 else "left"
+                insights.append({
+                    'type': 'distribution',
+                    'column': col,
+                    'message': f"{col} shows {direction}-skewed distribution",
+                    'detail': f"Skewness: {skewness:.2f}"
+                })
+        
+        return insights
     
     def generate_recommendations(self):
         """Generate actionable recommendations"""
@@ -211,8 +415,8 @@ class SmartReportGenerator:
                 })
         
         # Data quality recommendations
-        missing_data = self.df.isnull().sum()
-        high_missing = missing_data[missing_data > len(self.df) * 0.1]
+        missing_data = self.null_per_col
+        high_missing = missing_data[missing_data > self.n_rows * 0.1]
         
         if len(high_missing) > 0:
             self.recommendations.append({
@@ -224,36 +428,29 @@ class SmartReportGenerator:
     
     def generate_pdf(self, output_filename):
         """Generate comprehensive PDF report"""
+        # reportlab is only needed here, so analysis-only runs skip importing it
+        from reportlab.lib.pagesizes import letter, landscape
+        from reportlab.lib.units import inch
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, PageBreak
+        from reportlab.lib import colors
+        
         script_dir = os.path.dirname(os.path.abspath(__file__))
         reports_dir = os.path.join(script_dir, '..', 'reports')
         os.makedirs(reports_dir, exist_ok=True)
         
         output_path = os.path.join(reports_dir, output_filename)
         
-        doc = SimpleDocTemplate(output_path, pagesize=landscape(letter),
+        # Lay out into memory and write the finished file in one go
+        buf = io.BytesIO()
+        doc = SimpleDocTemplate(buf, pagesize=landscape(letter),
                                topMargin=0.5*inch, bottomMargin=0.5*inch)
         
         story = []
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'Title',
-            parent=styles['Heading1'],
-            fontSize=26,
-            textColor=colors.HexColor('#1e3a8a'),
-            spaceAfter=10,
-            alignment=TA_CENTER
-        )
-        
-        subtitle_style = ParagraphStyle(
-            'Subtitle',
-            parent=styles['Normal'],
-            fontSize=14,
-            textColor=colors.HexColor('#64748b'),
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
+        pdf_styles = self._styles()
+        styles = pdf_styles['sheet']
+        title_style, subtitle_style = pdf_styles['title'], pdf_styles['subtitle']
+        insight_style, footer_style = pdf_styles['insight'], pdf_styles['footer']
+        table_style = pdf_styles['table']
         
         # Cover Page
         story.append(Spacer(1, 1.5*inch))
@@ -261,7 +458,7 @@ class SmartReportGenerator:
         story.append(Paragraph("AI-Powered Data Analysis with Predictions & Insights", subtitle_style))
         story.append(Paragraph(f"Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", 
                               styles['Normal']))
-        story.append(Paragraph(f"Dataset: {len(self.df)} rows × {len(self.df.columns)} columns", 
+        story.append(Paragraph(f"Dataset: {self.n_rows} rows × {self.n_cols} columns", 
                               styles['Normal']))
         story.append(PageBreak())
         
@@ -270,8 +467,8 @@ class SmartReportGenerator:
         story.append(Spacer(1, 0.2*inch))
         
         summary_text = f"""
-        This report provides comprehensive analysis of your dataset containing {len(self.df):,} records 
-        across {len(self.df.columns)} variables. Our AI-powered analysis has identified {len(self.trends)} 
+        This report provides comprehensive analysis of your dataset containing {self.n_rows:,} records 
+        across {self.n_cols} variables. Our AI-powered analysis has identified {len(self.trends)} 
         significant trends, {len(self.insights)} key insights, and generated {len(self.predictions)} 
         predictions about future patterns. Based on this analysis, we provide {len(self.recommendations)} 
         actionable recommendations to optimize your outcomes.
@@ -286,17 +483,19 @@ class SmartReportGenerator:
             
             trend_data = [['Metric', 'Trend Direction', 'Strength', 'Current Average', 'Growth Rate']]
             
-            for trend in self.trends:
-                trend_data.append([
-                    trend['column'],
-                    trend['direction'].title(),
-                    trend['strength'].title(),
-                    f"{trend['mean']:.2f}",
-                    f"{trend['slope']:.2f}/period"
-                ])
+            # Format each numeric column in one call, then zip the rows together
+            means = np.char.mod('%.2f', np.array([t['mean'] for t in self.trends], dtype=float))
+            rates = np.char.mod('%.2f/period', np.array([t['slope'] for t in self.trends], dtype=float))
+            trend_data.extend(map(list, zip(
+                [t['column'] for t in self.trends],
+                [t['direction'].title() for t in self.trends],
+                [t['strength'].title() for t in self.trends],
+                means.tolist(),
+                rates.tolist()
+            )))
             
             trend_table = Table(trend_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch, 1.5*inch, 1.5*inch])
-            trend_table.setStyle(self._get_table_style())
+            trend_table.setStyle(table_style)
             story.append(trend_table)
             story.append(PageBreak())
         
@@ -307,18 +506,21 @@ class SmartReportGenerator:
             
             pred_data = [['Metric', 'Current Value', 'Predicted Value', 'Expected Change', 'Confidence']]
             
-            for pred in self.predictions:
-                arrow = "↗" if pred['change_percent'] > 0 else "↘"
-                pred_data.append([
-                    pred['column'],
-                    f"{pred['current_value']:.2f}",
-                    f"{pred['predicted_value']:.2f}",
-                    f"{arrow} {abs(pred['change_percent']):.1f}%",
-                    pred['confidence'].title()
-                ])
+            current = np.array([p['current_value'] for p in self.predictions], dtype=float)
+            predicted = np.array([p['predicted_value'] for p in self.predictions], dtype=float)
+            change_pct = np.array([p['change_percent'] for p in self.predictions], dtype=float)
+            changes = np.char.add(np.where(change_pct > 0, "↗ ", "↘ "),
+                                  np.char.mod('%.1f%%', np.abs(change_pct)))
+            pred_data.extend(map(list, zip(
+                [p['column'] for p in self.predictions],
+                np.char.mod('%.2f', current).tolist(),
+                np.char.mod('%.2f', predicted).tolist(),
+                changes.tolist(),
+                [p['confidence'].title() for p in self.predictions]
+            )))
             
             pred_table = Table(pred_data, colWidths=[2*inch, 1.8*inch, 1.8*inch, 1.8*inch, 1.5*inch])
-            pred_table.setStyle(self._get_table_style())
+            pred_table.setStyle(table_style)
             story.append(pred_table)
             
             story.append(Spacer(1, 0.3*inch))
@@ -333,13 +535,6 @@ class SmartReportGenerator:
             story.append(Spacer(1, 0.2*inch))
             
             for idx, insight in enumerate(self.insights, 1):
-                insight_style = ParagraphStyle(
-                    'Insight',
-                    parent=styles['Normal'],
-                    leftIndent=20,
-                    spaceAfter=10
-                )
-                
                 icon = "🔍" if insight['type'] == 'outlier' else "📊" if insight['type'] == 'correlation' else "🔄"
                 
                 story.append(Paragraph(f"<b>{icon} Insight {idx}: {insight['message']}</b>", styles['Normal']))
@@ -364,7 +559,7 @@ class SmartReportGenerator:
                 ])
             
             rec_table = Table(rec_data, colWidths=[1*inch, 1.5*inch, 2.5*inch, 3.5*inch])
-            rec_table.setStyle(self._get_table_style())
+            rec_table.setStyle(table_style)
             story.append(rec_table)
             story.append(PageBreak())
         
@@ -373,37 +568,80 @@ class SmartReportGenerator:
         story.append(Spacer(1, 0.2*inch))
         
         overview_data = [['Metric', 'Value']]
-        overview_data.append(['Total Records', f"{len(self.df):,}"])
-        overview_data.append(['Total Variables', str(len(self.df.columns))])
-        overview_data.append(['Numeric Variables', str(len(self.df.select_dtypes(include=[np.number]).columns))])
-        overview_data.append(['Date/Time Variables', str(len(self.df.select_dtypes(include=['datetime64']).columns))])
-        overview_data.append(['Text Variables', str(len(self.df.select_dtypes(include=['object']).columns))])
-        overview_data.append(['Missing Values', f"{self.df.isnull().sum().sum():,}"])
-        overview_data.append(['Completeness', f"{(1 - self.df.isnull().sum().sum()/(len(self.df)*len(self.df.columns)))*100:.1f}%"])
+        overview_data.append(['Total Records', f"{self.n_rows:,}"])
+        overview_data.append(['Total Variables', str(self.n_cols)])
+        overview_data.append(['Numeric Variables', str(len(self.numeric_cols))])
+        overview_data.append(['Date/Time Variables', str(len(self.datetime_cols))])
+        overview_data.append(['Text Variables', str(len(self.object_cols))])
+        overview_data.append(['Missing Values', f"{self.null_total:,}"])
+        overview_data.append(['Completeness', f"{self.completeness_pct:.1f}%"])
         
         overview_table = Table(overview_data, colWidths=[3*inch, 2*inch])
-        overview_table.setStyle(self._get_table_style())
+        overview_table.setStyle(table_style)
         story.append(overview_table)
         
         # Footer
         story.append(Spacer(1, 0.5*inch))
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.grey,
-            alignment=TA_CENTER
-        )
         story.append(Paragraph("This report was generated by Smart Data Studio's AI Analytics Engine", footer_style))
         story.append(Paragraph("For questions or deeper analysis, consult with your data team", footer_style))
         
         # Build PDF
         doc.build(story)
+        with open(output_path, 'wb') as f:
+            f.write(buf.getvalue())
         
         return output_path
     
-    def _get_table_style(self):
+    @classmethod
+    def _styles(cls):
+        """Paragraph styles and the shared table style, built once per process"""
+        if not cls._styles_cache:
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+            from reportlab.lib.enums import TA_CENTER
+            from reportlab.lib import colors
+            
+            styles = getSampleStyleSheet()
+            cls._styles_cache.update({
+                'sheet': styles,
+                'title': ParagraphStyle(
+                    'Title',
+                    parent=styles['Heading1'],
+                    fontSize=26,
+                    textColor=colors.HexColor('#1e3a8a'),
+                    spaceAfter=10,
+                    alignment=TA_CENTER
+                ),
+                'subtitle': ParagraphStyle(
+                    'Subtitle',
+                    parent=styles['Normal'],
+                    fontSize=14,
+                    textColor=colors.HexColor('#64748b'),
+                    spaceAfter=30,
+                    alignment=TA_CENTER
+                ),
+                'insight': ParagraphStyle(
+                    'Insight',
+                    parent=styles['Normal'],
+                    leftIndent=20,
+                    spaceAfter=10
+                ),
+                'footer': ParagraphStyle(
+                    'Footer',
+                    parent=styles['Normal'],
+                    fontSize=9,
+                    textColor=colors.grey,
+                    alignment=TA_CENTER
+                ),
+                'table': cls._get_table_style(),
+            })
+        return cls._styles_cache
+    
+    @staticmethod
+    def _get_table_style():
         """Standard table style"""
+        from reportlab.platypus import TableStyle
+        from reportlab.lib import colors
+        
         return TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e3a8a')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -5,16 +5,40 @@ Auto-detects columns, cleans data, prepares for visualization
 """
 import pandas as pd
 import numpy as np
+import hashlib
 import json
 import os
-from datetime import datetime
 import re
+import sys
+import pickle_cache
+
+# Optional multi-threaded CSV reader; the pandas C parser is used without it
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Type probes parse a leading sample of a column, then confirm on a random one
+PROBE_ROWS = 1000
+CONFIRM_ROWS = 500
+
+# Cleaned frames are cached in this folder next to the uploaded file
+CACHE_DIR_NAME = '.cache'
+
+# Rows parsed up front to learn the CSV's numeric dtypes
+PEEK_ROWS = 5000
+
+_BOOL_TOKENS = frozenset({'true', 'false', 'yes', 'no', '1', '0', 't', 'f', 'y', 'n'})
+_TRUTHY = frozenset({'true', 'yes', '1', 't', 'y'})
 
 class SmartDataProcessor:
     def __init__(self):
         self.df = None
         self.metadata = {}
         self.cleaning_report = []
+        self._medians = None  # numeric medians from analyze_columns, reused by clean_data
         
     def load_data(self, filepath):
         """Load data from CSV or Excel - auto-detect format"""
@@ -24,8 +48,9 @@ class SmartDataProcessor:
                 self.cleaning_report.append(f"❌ File not found: {filepath}")
                 return False
             
+            self._prefetch(filepath)
             if filepath.endswith('.csv'):
-                self.df = pd.read_csv(filepath)
+                self.df = self._read_csv(filepath)
                 self.cleaning_report.append(f"✅ Loaded CSV file")
             elif filepath.endswith(('.xlsx', '.xls')):
                 self.df = pd.read_excel(filepath)
@@ -45,6 +70,99 @@ class SmartDataProcessor:
             self.cleaning_report.append(f"❌ Load error: {str(e)}")
             return False
     
+    def load_and_clean(self, filepath, options=None):
+        """load_data + analyze_columns + clean_data, reused from disk while the file is unchanged"""
+        cache_path = self._cache_path(filepath, options)
+        if cache_path:
+            cached = pickle_cache.load(cache_path)
+            if cached is not pickle_cache.MISS:
+                self.df, self.metadata, self.cleaning_report = cached
+                return True
+        
+        if not self.load_data(filepath):
+            return False
+        if self.analyze_columns():
+            self.clean_data(options)
+            if cache_path:
+                self._save_cache(cache_path)
+        return True
+    
+    def _cache_path(self, filepath, options):
+        """Cache file for the cleaned frame, keyed on path, mtime, size and cleaning options"""
+        try:
+            filepath = os.path.abspath(filepath)
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        key = hashlib.sha1(
+            f"{filepath}:{stat.st_mtime_ns}:{stat.st_size}:{json.dumps(options, sort_keys=True)}".encode()
+        ).hexdigest()[:16]
+        return os.path.join(os.path.dirname(filepath), CACHE_DIR_NAME, f"{key}.clean.pkl")
+    
+    def _save_cache(self, cache_path):
+        """Pickle the cleaned frame and its metadata (written atomically)"""
+        try:
+            pickle_cache.save(cache_path, (self.df, self.metadata, self.cleaning_report))
+        except Exception as e:
+            print(f"Cache write failed: {str(e)}", file=sys.stderr)
+    
+    @staticmethod
+    def _prefetch(filepath):
+        """Ask the kernel to start reading the whole file ahead of the parser (Linux)"""
+        if not hasattr(os, 'posix_fadvise'):
+            return
+        try:
+            fd = os.open(filepath, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass  # only a hint
+    
+    def _read_csv(self, filepath):
+        """Read a CSV with Arrow when installed, else pinning the numeric dtypes seen in its first rows"""
+        if HAS_PYARROW:
+            try:
+                return self._read_csv_arrow(filepath)
+            except Exception:
+                pass  # input Arrow rejects (ragged rows, odd encodings); the C parser is more lenient
+        
+        head = pd.read_csv(filepath, nrows=PEEK_ROWS)
+        if len(head) < PEEK_ROWS:
+            return head  # the peek already holds the whole file
+        
+        # Pinned columns skip the parser's type inference; a later value that
+        # doesn't fit (text, a gap in an int column) raises and we re-read plainly
+        dtype_map = {col: dtype for col, dtype in head.dtypes.items() if dtype.kind in 'biuf'}
+        try:
+            return pd.read_csv(filepath, dtype=dtype_map, engine='c')
+        except (ValueError, TypeError, OverflowError):
+            return pd.read_csv(filepath)
+    
+    @staticmethod
+    def _read_csv_arrow(filepath):
+        """Parse a CSV on all cores with Arrow, handing buffers to pandas as they convert"""
+        read_options = pacsv.ReadOptions(use_threads=True, block_size=8 << 20)
+        convert_options = pacsv.ConvertOptions(strings_can_be_null=True)
+        table = pacsv.read_csv(filepath, read_options=read_options, convert_options=convert_options)
+        
+        # Arrow infers ISO dates, times and timestamps that the C parser leaves
+        # as text for type detection; re-read those columns as strings
+        temporal = {field.name: pa.string() for field in table.schema if pa.types.is_temporal(field.type)}
+        if temporal:
+            convert_options.column_types = temporal
+            table = pacsv.read_csv(filepath, read_options=read_options, convert_options=convert_options)
+        
+        # All-empty columns come back as Arrow's null type; the C parser gives float64
+        schema = pa.schema([
+            field.with_type(pa.float64()) if pa.types.is_null(field.type) else field for field in table.schema
+        ])
+        if not schema.equals(table.schema):
+            table = table.cast(schema)
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+    
     def analyze_columns(self):
         """Auto-detect column types and characteristics"""
         if self.df is None:
@@ -52,21 +170,42 @@ class SmartDataProcessor:
         
         column_info = {}
         
+        # Whole-frame passes instead of several scans per column
+        missing = self.df.isna().sum()
+        missing_pct = missing / len(self.df) * 100
+        uniq = self.df.nunique()
+        numeric = self.df.select_dtypes(include=np.number)
+        if len(numeric.columns):
+            num_stats = numeric.agg(['min', 'max', 'mean', 'median'])
+            self._medians = num_stats.loc['median']
+        else:
+            # agg over zero columns raises, so all-text frames get empty stats
+            num_stats = pd.DataFrame(index=['min', 'max', 'mean', 'median'])
+            self._medians = pd.Series(dtype=float)
+        
         for col in self.df.columns:
+            series = self.df[col]
+            sample = series.head(5) if missing[col] == 0 else series.dropna().head(5)
             info = {
                 'name': col,
-                'original_type': str(self.df[col].dtype),
-                'missing_count': int(self.df[col].isna().sum()),
-                'missing_percent': float(self.df[col].isna().sum() / len(self.df) * 100),
-                'unique_count': int(self.df[col].nunique()),
-                'sample_values': [str(v) for v in self.df[col].dropna().head(5).tolist()]  # Convert to string
+                'original_type': str(series.dtype),
+                'missing_count': int(missing[col]),
+                'missing_percent': float(missing_pct[col]),
+                'unique_count': int(uniq[col]),
+                'sample_values': [str(v) for v in sample.tolist()]  # Convert to string
             }
             
             # Detect actual data type
-            info['detected_type'] = self._detect_column_type(self.df[col])
+            info['detected_type'] = self._detect_column_type(series, n_unique=uniq[col])
             
             # Add statistics based on type
-            if info['detected_type'] == 'numeric':
+            if info['detected_type'] == 'numeric' and col in num_stats.columns:
+                stats = num_stats[col]
+                for stat in ('min', 'max', 'mean', 'median'):
+                    info[stat] = float(stats[stat]) if not pd.isna(stats[stat]) else None
+            
+            elif info['detected_type'] == 'numeric':
+                # Numbers stored as text/bool keep the per-column path
                 try:
                     info['min'] = float(self.df[col].min()) if not pd.isna(self.df[col].min()) else None
                     info['max'] = float(self.df[col].max()) if not pd.isna(self.df[col].max()) else None
@@ -97,42 +236,50 @@ class SmartDataProcessor:
         self.metadata['columns'] = column_info
         return column_info
     
-    def _detect_column_type(self, series):
-        """Detect the actual type of a column"""
+    def _detect_column_type(self, series, n_unique=None):
+        """Detect the actual type of a column (n_unique: its distinct non-null count, if known)"""
         # Remove nulls for analysis
         series_clean = series.dropna()
         
         if len(series_clean) == 0:
             return 'unknown'
         
+        # Columns pandas already typed need no parse probes
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            return 'boolean'
+        if pd.api.types.is_numeric_dtype(dtype):
+            return 'numeric'
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return 'datetime'
+        if isinstance(dtype, pd.CategoricalDtype):
+            return 'categorical'
+        
         # Check if numeric
-        try:
-            pd.to_numeric(series_clean, errors='raise')
+        if self._parses(series_clean, lambda s: pd.to_numeric(s, errors='raise')):
             return 'numeric'
-        except:
-            pass
         
         # Check if datetime (suppress warnings)
-        try:
-            import warnings
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                pd.to_datetime(series_clean, errors='raise')
-            return 'datetime'
-        except:
-            pass
+        import warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            if self._parses(series_clean, lambda s: pd.to_datetime(s, errors='raise')):
+                return 'datetime'
         
-        # Check if boolean
+        # Check if boolean (only columns with at most two distinct values need a look)
         try:
-            unique_vals = series_clean.unique()
-            if len(unique_vals) <= 2 and all(str(v).lower() in ['true', 'false', 'yes', 'no', '1', '0', 't', 'f', 'y', 'n'] for v in unique_vals):
-                return 'boolean'
+            if n_unique is None:
+                n_unique = series_clean.nunique()
+            if n_unique <= 2:
+                unique_vals = series_clean.unique()
+                if pd.Series(unique_vals).astype(str).str.lower().isin(_BOOL_TOKENS).all():
+                    return 'boolean'
         except:
             pass
         
         # Check if categorical (low cardinality)
         try:
-            if series_clean.nunique() / len(series_clean) < 0.5:
+            if n_unique / len(series_clean) < 0.5:
                 return 'categorical'
         except:
             pass
@@ -140,6 +287,24 @@ class SmartDataProcessor:
         # Default to text
         return 'text'
     
+    def _columns_by_type(self):
+        """Column names grouped by detected type, in frame order"""
+        groups = {}
+        for col, info in self.metadata['columns'].items():
+            groups.setdefault(info['detected_type'], []).append(col)
+        return groups
+    
+    @staticmethod
+    def _parses(series_clean, parse):
+        """Whether parse accepts the column, judged on a leading and a random sample"""
+        try:
+            parse(series_clean.head(PROBE_ROWS))
+            if len(series_clean) > PROBE_ROWS:
+                parse(series_clean.sample(CONFIRM_ROWS, random_state=0))
+            return True
+        except:
+            return False
+    
     def clean_data(self, options=None):
         """Clean data based on detected issues"""
         if options is None:
@@ -161,8 +326,13 @@ class SmartDataProcessor:
             if removed > 0:
                 self.cleaning_report.append(f"🧹 Removed {removed} duplicate rows")
         
+        by_type = self._columns_by_type()
+        
         # 2. Handle missing values
         if options.get('handle_missing') == 'smart':
+            # Fill values are collected per column and applied in one fillna
+            fill_map = {}
+            numeric_fill = []
             for col in self.df.columns:
                 col_type = self.metadata['columns'][col]['detected_type']
                 missing_pct = self.metadata['columns'][col]['missing_percent']
@@ -173,37 +343,50 @@ class SmartDataProcessor:
                 
                 elif missing_pct > 0:
                     if col_type == 'numeric':
-                        # Fill with median
-                        self.df[col].fillna(self.df[col].median(), inplace=True)
+                        # Fill with median (looked up for all numeric columns at once, below)
+                        numeric_fill.append(col)
                         self.cleaning_report.append(f"🔧 Filled {col} missing values with median")
                     
                     elif col_type == 'categorical':
                         # Fill with mode
-                        self.df[col].fillna(self.df[col].mode()[0] if len(self.df[col].mode()) > 0 else 'Unknown', inplace=True)
+                        mode = self.df[col].mode()
+                        fill_map[col] = mode[0] if len(mode) > 0 else 'Unknown'
                         self.cleaning_report.append(f"🔧 Filled {col} missing values with mode")
                     
                     else:
                         # Fill with 'Unknown' or 'N/A'
-                        self.df[col].fillna('N/A', inplace=True)
+                        fill_map[col] = 'N/A'
                         self.cleaning_report.append(f"🔧 Filled {col} missing values with N/A")
+            
+            if numeric_fill:
+                # The medians from analyze_columns still hold unless rows were dropped
+                if len(self.df) == original_rows and set(numeric_fill).issubset(self._medians.index):
+                    medians = self._medians[numeric_fill]
+                else:
+                    medians = self.df[numeric_fill].median()
+                fill_map.update(medians.to_dict())
+            
+            if fill_map:
+                self.df = self.df.fillna(value=fill_map)
         
         # 3. Convert data types
         if options.get('convert_types', True):
             import warnings
+            numeric_cols = by_type.get('numeric', [])
+            if numeric_cols:
+                self.df[numeric_cols] = self.df[numeric_cols].apply(pd.to_numeric, errors='coerce')
+            
             for col in self.df.columns:
                 col_type = self.metadata['columns'][col]['detected_type']
                 
                 try:
-                    if col_type == 'numeric':
-                        self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
-                    
-                    elif col_type == 'datetime':
+                    if col_type == 'datetime':
                         with warnings.catch_warnings():
                             warnings.simplefilter("ignore")
                             self.df[col] = pd.to_datetime(self.df[col], errors='coerce')
                     
                     elif col_type == 'boolean':
-                        self.df[col] = self.df[col].map(lambda x: str(x).lower() in ['true', 'yes', '1', 't', 'y'])
+                        self.df[col] = self.df[col].astype(str).str.lower().isin(_TRUTHY)
                     
                     self.cleaning_report.append(f"✅ Converted {col} to {col_type}")
                 
@@ -212,31 +395,49 @@ class SmartDataProcessor:
         
         # 4. Standardize text columns
         if options.get('standardize_text', True):
-            for col in self.df.columns:
-                if self.metadata['columns'][col]['detected_type'] in ['text', 'categorical']:
-                    # Strip whitespace
-                    self.df[col] = self.df[col].astype(str).str.strip()
-                    # Standardize case for categorical
-                    if self.metadata['columns'][col]['detected_type'] == 'categorical':
-                        self.df[col] = self.df[col].str.title()
+            # Strip whitespace
+            for col in by_type.get('text', []):
+                self.df[col] = self.df[col].astype(str).str.strip()
+            
+            # Strip and standardize case for categorical; low cardinality means
+            # each distinct label is fixed once and mapped back through its codes
+            for col in by_type.get('categorical', []):
+                codes, labels = pd.factorize(self.df[col].astype(str))
+                labels = pd.Series(labels, dtype=object).str.strip().str.title().to_numpy()
+                self.df[col] = labels[codes]
         
         # 5. Remove outliers (optional)
         if options.get('remove_outliers', False):
-            for col in self.df.columns:
-                if self.metadata['columns'][col]['detected_type'] == 'numeric':
-                    Q1 = self.df[col].quantile(0.25)
-                    Q3 = self.df[col].quantile(0.75)
-                    IQR = Q3 - Q1
-                    lower = Q1 - 1.5 * IQR
-                    upper = Q3 + 1.5 * IQR
-                    
-                    before = len(self.df)
-                    self.df = self.df[(self.df[col] >= lower) & (self.df[col] <= upper)]
-                    removed = before - len(self.df)
-                    
+            numeric_cols = by_type.get('numeric', [])
+            if numeric_cols:
+                # IQR fences for every numeric column at once, then a single row filter
+                num_df = self.df[numeric_cols]
+                q = num_df.quantile([0.25, 0.75])
+                IQR = q.loc[0.75] - q.loc[0.25]
+                lower = q.loc[0.25] - 1.5 * IQR
+                upper = q.loc[0.75] + 1.5 * IQR
+                inside = ((num_df >= lower) & (num_df <= upper)).to_numpy()
+                keep = inside.all(axis=1)
+                
+                # Credit each dropped row to the first column that rejects it
+                first_out = inside[~keep].argmin(axis=1)
+                removed_per_col = np.bincount(first_out, minlength=len(numeric_cols))
+                self.df = self.df[keep]
+                
+                for col, removed in zip(numeric_cols, removed_per_col):
                     if removed > 0:
                         self.cleaning_report.append(f"🎯 Removed {removed} outliers from {col}")
         
+        # 6. Compact storage: smallest lossless int types, categoricals as codes
+        if options.get('convert_types', True):
+            for col in by_type.get('numeric', []):
+                if self.df[col].dtype.kind in 'iu':
+                    self.df[col] = pd.to_numeric(self.df[col], downcast='integer')
+            for col in by_type.get('categorical', []):
+                # Categories in order of appearance, so value_counts ties keep the object-column order
+                values = self.df[col]
+                self.df[col] = values.astype(pd.CategoricalDtype(values.dropna().unique()))
+        
         final_rows = len(self.df)
         self.cleaning_report.append(f"📊 Final dataset: {final_rows} rows ({original_rows - final_rows} removed)")
         
@@ -326,30 +527,16 @@ class SmartDataProcessor:
             if not viz_type:
                 return {'error': 'No visualization type specified'}
             
-            def make_json_safe(data):
-                """Convert data to JSON-safe format"""
-                if isinstance(data, dict):
-                    return {k: make_json_safe(v) for k, v in data.items()}
-                elif isinstance(data, list):
-                    return [make_json_safe(item) for item in data]
-                elif isinstance(data, (pd.Timestamp, datetime)):
-                    return str(data)
-                elif isinstance(data, (np.integer, np.floating)):
-                    return float(data)
-                elif pd.isna(data):
-                    return None
-                else:
-                    return str(data)
-            
             if viz_type == 'bar':
                 # Count frequency of categories
                 col = viz_config.get('x')
                 if not col or col not in self.df.columns:
                     return []
                 
-                data = self.df[col].value_counts().reset_index()
+                # Only the bars that are shown get turned into rows
+                data = self.df[col].value_counts().head(20).reset_index()
                 data.columns = [col, 'count']
-                return make_json_safe(data.head(20).to_dict('records'))
+                return self._json_records(data)
             
             elif viz_type == 'histogram':
                 # Create bins for histogram
@@ -357,8 +544,14 @@ class SmartDataProcessor:
                 if not col or col not in self.df.columns:
                     return {'bins': [], 'counts': []}
                 
-                # Get numeric data only
-                numeric_data = pd.to_numeric(self.df[col], errors='coerce').dropna()
+                # Get numeric data only (int/float columns are used as they are)
+                series = self.df[col]
+                if series.dtype.kind in 'iuf':
+                    numeric_data = series.to_numpy()
+                    if series.dtype.kind == 'f':
+                        numeric_data = numeric_data[~np.isnan(numeric_data)]
+                else:
+                    numeric_data = pd.to_numeric(series, errors='coerce').dropna()
                 
                 if len(numeric_data) == 0:
                     return {'bins': [], 'counts': []}
@@ -384,7 +577,7 @@ class SmartDataProcessor:
                 data[y_col] = pd.to_numeric(data[y_col], errors='coerce')
                 data = data.dropna()
                 
-                return make_json_safe(data.head(1000).to_dict('records'))
+                return self._json_records(data.head(1000))
             
             elif viz_type == 'line':
                 # Group by time and aggregate
@@ -394,12 +587,15 @@ class SmartDataProcessor:
                 if not x_col or not y_col or x_col not in self.df.columns or y_col not in self.df.columns:
                     return []
                 
-                # Convert y to numeric
-                df_copy = self.df.copy()
-                df_copy[y_col] = pd.to_numeric(df_copy[y_col], errors='coerce')
+                # Only the two columns involved; y converted to numeric
+                x = self.df[x_col]
+                # Group categorical x by label, in sorted order as for plain text
+                if isinstance(x.dtype, pd.CategoricalDtype):
+                    x = x.astype(object)
+                y = pd.to_numeric(self.df[y_col], errors='coerce')
                 
-                data = df_copy.groupby(x_col)[y_col].mean().reset_index()
-                return make_json_safe(data.head(100).to_dict('records'))
+                data = pd.DataFrame({x_col: x, y_col: y}).groupby(x_col)[y_col].mean().reset_index()
+                return self._json_records(data.head(100))
             
             elif viz_type == 'pie':
                 # Count frequency
@@ -407,18 +603,21 @@ class SmartDataProcessor:
                 if not col or col not in self.df.columns:
                     return []
                 
-                data = self.df[col].value_counts().reset_index()
+                data = self.df[col].value_counts().head(10).reset_index()
                 data.columns = ['category', 'value']
-                return make_json_safe(data.head(10).to_dict('records'))
+                return self._json_records(data)
             
             elif viz_type == 'heatmap':
                 # Correlation matrix
                 columns = viz_config.get('columns', [])
                 
-                # Filter to only numeric columns that exist
+                # Filter to only numeric columns that exist; anything already
+                # stored as numbers skips the parse check
                 numeric_cols = []
                 for col in columns:
-                    if col in self.df.columns:
+                    if col in self.df.columns and pd.api.types.is_numeric_dtype(self.df[col]):
+                        numeric_cols.append(col)
+                    elif col in self.df.columns:
                         try:
                             pd.to_numeric(self.df[col], errors='raise')
                             numeric_cols.append(col)
@@ -431,17 +630,35 @@ class SmartDataProcessor:
                 corr_matrix = self.df[numeric_cols].corr()
                 return {
                     'columns': numeric_cols,
-                    'correlation': [[float(v) if not pd.isna(v) else 0 for v in row] for row in corr_matrix.values.tolist()]
+                    'correlation': np.nan_to_num(corr_matrix.to_numpy(dtype=float), nan=0.0).tolist()
                 }
             
             return []
             
         except Exception as e:
-            print(f"Error preparing visualization: {str(e)}")
+            print(f"Error preparing visualization: {str(e)}", file=sys.stderr)
             import traceback
             traceback.print_exc()
             return []
     
+    @staticmethod
+    def _json_records(frame):
+        """Rows of a frame as JSON-safe dicts, converted a column at a time"""
+        columns = []
+        for col in frame.columns:
+            series = frame[col]
+            kind = series.dtype.kind
+            if kind in 'iu':
+                values = series.tolist()
+            elif kind == 'f':
+                values = series.astype(object).where(series.notna(), None).tolist()
+            elif kind == 'M':
+                values = series.astype(object).map(str).where(series.notna(), None).tolist()
+            else:
+                values = series.astype(str).where(series.notna(), None).tolist()
+            columns.append(values)
+        return [dict(zip(frame.columns, row)) for row in zip(*columns)]
+    
     def export_cleaned_data(self, output_path):
         """Export cleaned data"""
         if output_path.endswith('.csv'):
@@ -456,19 +673,14 @@ class SmartDataProcessor:
         # Convert data preview to handle datetime objects
         preview_data = []
         if self.df is not None and not self.df.empty:
-            for _, row in self.df.head(10).iterrows():
-                row_dict = {}
-                for col, val in row.items():
-                    # Convert datetime/timestamp to string
-                    if pd.api.types.is_datetime64_any_dtype(type(val)) or isinstance(val, pd.Timestamp):
-                        row_dict[col] = str(val)
-                    elif pd.isna(val):
-                        row_dict[col] = None
-                    elif isinstance(val, (np.integer, np.floating)):
-                        row_dict[col] = float(val)
-                    else:
-                        row_dict[col] = str(val)
-                preview_data.append(row_dict)
+            # Stringify column by column (datetimes via str() per Timestamp, which
+            # keeps the full 'YYYY-MM-DD HH:MM:SS' form); missing values become null
+            head = self.df.head(10)
+            preview = pd.DataFrame({
+                col: head[col].astype(object).map(str) if pd.api.types.is_datetime64_any_dtype(head[col]) else head[col].astype(str)
+                for col in head.columns
+            }, index=head.index)
+            preview_data = preview.where(head.notna().to_numpy(), None).to_dict(orient='records')
         
         return {
             'total_rows': len(self.df) if self.df is not None else 0,
@@ -479,8 +691,6 @@ class SmartDataProcessor:
         }
 
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) < 3:
         print(json.dumps({"success": False, "error": "Usage: python smart_processor.py <command> <filepath>"}))
         sys.exit(1)
@@ -492,8 +702,8 @@ if __name__ == "__main__":
     
     try:
         if command == "analyze":
-            # Load and analyze data
-            if not processor.load_data(filepath):
+            # Load, analyze and clean data
+            if not processor.load_and_clean(filepath):
                 print(json.dumps({
                     "success": False,
                     "error": "Failed to load file",
@@ -501,9 +711,7 @@ if __name__ == "__main__":
                 }))
                 sys.exit(1)
             
-            column_info = processor.analyze_columns()
-            
-            if not column_info:
+            if not processor.metadata.get('columns'):
                 print(json.dumps({
                     "success": False,
                     "error": "No columns found in file",
@@ -511,7 +719,6 @@ if __name__ == "__main__":
                 }))
                 sys.exit(1)
             
-            processor.clean_data()
             suggestions = processor.get_visualization_suggestions()
             
             result = {
@@ -548,13 +755,11 @@ if __name__ == "__main__":
                 }))
                 sys.exit(1)
             
-            if not processor.load_data(filepath):
+            # Reuses the frame cleaned by the analyze step when the file is unchanged
+            if not processor.load_and_clean(filepath):
                 print(json.dumps({"success": False, "error": "Failed to load file"}))
                 sys.exit(1)
             
-            processor.analyze_columns()
-            processor.clean_data()
-            
             viz_data = processor.prepare_visualization_data(viz_config)
             
             result = {
@@ -564,6 +769,30 @@ if __name__ == "__main__":
             
             print(json.dumps(result))
         
+        elif command == "serve":
+            # Long-lived worker for one file: a viz_config per stdin line in,
+            # a result per stdout line out, with the cleaned frame kept in memory
+            if not processor.load_and_clean(filepath):
+                print(json.dumps({"success": False, "error": "Failed to load file"}), flush=True)
+                sys.exit(1)
+            print(json.dumps({"success": True, "ready": True}), flush=True)
+            
+            for line in sys.stdin:
+                if not line.strip():
+                    continue
+                try:
+                    viz_config = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(json.dumps({
+                        "success": False,
+                        "error": f"Invalid JSON in viz_config: {str(e)}",
+                        "type": "JSONDecodeError"
+                    }), flush=True)
+                    continue
+                
+                viz_data = processor.prepare_visualization_data(viz_config)
+                print(json.dumps({"success": True, "data": viz_data}), flush=True)
+        
         else:
             print(json.dumps({"success": False, "error": f"Unknown command: {command}"}))
             sys.exit(1)